@@ -0,0 +1,247 @@
+"""Content-addressed memoization of backtest results.
+
+A backtest is keyed by a SHA-256 over everything that can change its
+result: the candle data, the strategy class and its parameters, the
+initial cash, the engine's risk limits, `ENGINE_VERSION` and the source
+of the modules the engine runs. Editing any of that code or feeding
+different data produces a new key, so stale results are never returned
+and simply age out of the cache.
+
+`BacktestCache` keeps an in-memory LRU tier in front of an optional
+on-disk tier of JSON files bounded by total size (oldest evicted first).
+"""
+
+import hashlib
+import importlib
+import inspect
+import json
+import os
+import sys
+import tempfile
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import List
+
+import numpy as np
+
+from app.backtest.engine import ENGINE_VERSION, BacktestEngine
+from app.backtest.models import BacktestResult
+from app.logging import get_logger
+from app.market.models import OHLCV
+from app.signals.base import SignalStrategy
+
+logger = get_logger(__name__)
+
+# Modules whose source feeds into every cache key.
+CODE_MODULES = (
+    "app.backtest.engine",
+    "app.backtest.metrics",
+    "app.backtest.models",
+    "app.backtest.recorders",
+    "app.portfolio.engine",
+    "app.portfolio.models",
+    "app.portfolio.risk",
+    "app.portfolio.sizing",
+    "app.signals.base",
+    "app.signals.indicators",
+)
+
+
+@lru_cache(maxsize=256)
+def _file_digest(path: str, mtime_ns: int, size: int) -> str:
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def code_fingerprint(strategy_cls: type) -> str:
+    """Hash the source of the engine modules and every strategy class's module.
+
+    The modules of all classes in the strategy's MRO are included, so
+    editing a base class invalidates results too. File digests are
+    memoized on `(path, mtime, size)`, so this only re-reads files that
+    changed on disk.
+    """
+    paths = [inspect.getfile(importlib.import_module(name)) for name in CODE_MODULES]
+    for cls in strategy_cls.__mro__:
+        # Skip `object`, `ABC` and other standard-library bases.
+        if cls.__module__.partition(".")[0] in sys.stdlib_module_names:
+            continue
+        paths.append(inspect.getfile(cls))
+
+    digest = hashlib.sha256()
+    for path in sorted(set(paths)):
+        stat = os.stat(path)
+        digest.update(_file_digest(path, stat.st_mtime_ns, stat.st_size).encode())
+    return digest.hexdigest()
+
+
+def data_fingerprint(data: List[OHLCV]) -> str:
+    """Hash a candle series via packed numpy buffers rather than JSON."""
+    digest = hashlib.sha256()
+    digest.update("\0".join(c.symbol for c in data).encode())
+    digest.update(
+        np.array([c.candle_date.toordinal() for c in data], dtype=np.int64).tobytes()
+    )
+    digest.update(
+        np.array(
+            [(c.open_price, c.high, c.low, c.close, c.volume) for c in data],
+            dtype=np.float64,
+        ).tobytes()
+    )
+    return digest.hexdigest()
+
+
+def backtest_cache_key(
+    engine: BacktestEngine,
+    data: List[OHLCV],
+    strategy: SignalStrategy,
+    initial_cash: float,
+    data_digest: str | None = None,
+) -> str:
+    """Stable key for `engine.run(data, strategy, initial_cash)`.
+
+    Pass `data_digest` (from `data_fingerprint(data)`) to skip rehashing
+    the same candles when keying many runs over them.
+    """
+    strategy_cls = type(strategy)
+    payload = {
+        "engine_version": ENGINE_VERSION,
+        "code": code_fingerprint(strategy_cls),
+        "data": data_digest or data_fingerprint(data),
+        "strategy": f"{strategy_cls.__module__}.{strategy_cls.__qualname__}",
+        "params": strategy.params(),
+        "initial_cash": float(initial_cash),
+        "risk_limits": (
+            engine.risk_limits.model_dump(mode="json") if engine.risk_limits else None
+        ),
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class BacktestCache:
+    """Two-tier (memory LRU + size-bounded disk) cache of backtest results.
+
+    Example:
+        cache = BacktestCache(directory=".cache/backtests")
+        result = cache.run(BacktestEngine(), data, SwingSMARsiStrategy())
+    """
+
+    def __init__(
+        self,
+        directory: str | Path | None = None,
+        max_entries: int = 128,
+        max_bytes: int = 256 * 1024 * 1024,
+    ):
+        self.directory = Path(directory) if directory is not None else None
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._memory: OrderedDict[str, BacktestResult] = OrderedDict()
+        self._lock = threading.Lock()
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    def run(
+        self,
+        engine: BacktestEngine,
+        data: List[OHLCV],
+        strategy: SignalStrategy,
+        initial_cash: float = 100_000,
+    ) -> BacktestResult:
+        """Return the cached result for these inputs, running the engine on a miss."""
+        key = backtest_cache_key(engine, data, strategy, initial_cash)
+        result = self.get(key)
+        if result is not None:
+            return result
+
+        result = engine.run(data=data, strategy=strategy, initial_cash=initial_cash)
+        self.put(key, result)
+        return result.model_copy(deep=True)
+
+    def get(self, key: str) -> BacktestResult | None:
+        with self._lock:
+            result = self._memory.get(key)
+            if result is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return result.model_copy(deep=True)
+
+        result = self._read_disk(key)
+        with self._lock:
+            if result is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._remember(key, result)
+        return result.model_copy(deep=True)
+
+    def put(self, key: str, result: BacktestResult) -> None:
+        stored = result.model_copy(deep=True)
+        with self._lock:
+            self._remember(key, stored)
+        self._write_disk(key, stored)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+        if self.directory is not None:
+            for path in self.directory.glob("*.json"):
+                path.unlink(missing_ok=True)
+
+    def _remember(self, key: str, result: BacktestResult) -> None:
+        self._memory[key] = result
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def _read_disk(self, key: str) -> BacktestResult | None:
+        if self.directory is None:
+            return None
+        path = self._path(key)
+        try:
+            payload = path.read_text()
+        except FileNotFoundError:
+            return None
+        try:
+            result = BacktestResult.model_validate_json(payload)
+        except ValueError:
+            logger.warning("Discarding unreadable cache entry", extra={"key": key})
+            path.unlink(missing_ok=True)
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            # Evicted by another thread or process after we read it.
+            pass
+        return result
+
+    def _write_disk(self, key: str, result: BacktestResult) -> None:
+        if self.directory is None:
+            return
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as handle:
+            handle.write(result.model_dump_json())
+        os.replace(tmp, self._path(key))
+        self._evict_disk()
+
+    def _evict_disk(self) -> None:
+        entries = []
+        for path in self.directory.glob("*.json"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
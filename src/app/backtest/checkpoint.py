@@ -0,0 +1,27 @@
+"""Compact on-disk storage for `BacktestCheckpoint`.
+
+Checkpoints are written as gzip-compressed JSON, atomically (temp file
+and rename) so a crashed daily update never leaves a truncated file.
+"""
+
+import gzip
+import os
+import tempfile
+from pathlib import Path
+
+from app.backtest.models import BacktestCheckpoint
+
+
+def save_checkpoint(checkpoint: BacktestCheckpoint, path: str | Path) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    with os.fdopen(fd, "wb") as handle:
+        handle.write(gzip.compress(checkpoint.model_dump_json().encode()))
+    os.replace(tmp, path)
+
+
+def load_checkpoint(path: str | Path) -> BacktestCheckpoint:
+    return BacktestCheckpoint.model_validate_json(
+        gzip.decompress(Path(path).read_bytes())
+    )
@@ -1,87 +1,349 @@
-from typing import List
-from app.backtest.metrics import max_drawdown
-from app.backtest.models import BacktestResult, Trade
+from collections import deque
+from datetime import date
+from typing import Dict, Iterable, List, Set, Tuple
+from app.backtest.models import BacktestCheckpoint, BacktestResult, Trade
+from app.backtest.recorders import BacktestRecorder, MemoryRecorder
 from app.market.models import OHLCV
 from app.portfolio.engine import PortfolioEngine
 from app.portfolio.models import Portfolio
+from app.portfolio.risk import RiskLimits, RiskManager
 from app.signals.base import SignalStrategy
 
+# Bump when a change alters results in a way source hashing cannot see
+# (e.g. a dependency upgrade); cached results keyed on it are invalidated.
+ENGINE_VERSION = "3"
 
-class BacktestEngine:
+
+def _strategy_name(strategy: SignalStrategy) -> str:
+    cls = type(strategy)
+    return f"{cls.__module__}.{cls.__qualname__}"
+
+
+class BacktestSession:
     """
-    Portfolio-aware backtesting engine.
+    Incremental backtest over candles fed in one or more batches.
+
+    All running state (portfolio, open trades, the strategy's lookback
+    window per symbol, drawdown and win counters, risk state) is held here so it can
+    be captured with `checkpoint()` and continued later with `restore()`.
+    Feeding candles in several batches gives the same result as feeding
+    them all at once. The equity curve and closed trades go to the
+    recorder and are not part of the checkpoint, so its size does not grow
+    with history.
     """
 
-    def run(
+    def __init__(
         self,
-        data: List[OHLCV],
         strategy: SignalStrategy,
         initial_cash: float = 100_000,
-    ) -> BacktestResult:
-        portfolio = Portfolio(
+        risk_limits: RiskLimits | None = None,
+        recorder: BacktestRecorder | None = None,
+    ):
+        self.strategy = strategy
+        self.initial_cash = initial_cash
+        self.risk_limits = risk_limits
+        self.recorder = recorder or MemoryRecorder(max_points=10_000, max_trades=10_000)
+        self.portfolio = Portfolio(
             cash=initial_cash,
             positions={},
             equity=initial_cash,
         )
+        self.risk = RiskManager(risk_limits) if risk_limits else None
+        self.windows: Dict[str, deque] = {}
+        self.open_trades: Dict[str, Trade] = {}
+        self.total_trades = 0
+        self.wins = 0
+        self.peak_equity: float | None = None
+        self.max_drawdown = 0.0
+        self.last_date: date | None = None
+        self.last_symbols: Set[str] = set()
+        self._resumed_at: Tuple[date, Set[str]] | None = None
+        self._portfolio_engine = PortfolioEngine(risk=self.risk)
+
+    @classmethod
+    def restore(
+        cls,
+        checkpoint: BacktestCheckpoint,
+        strategy: SignalStrategy,
+        recorder: BacktestRecorder | None = None,
+    ) -> "BacktestSession":
+        """
+        Rebuild a session from `checkpoint`.
+
+        The restored session skips candles the checkpoint already covers,
+        i.e. those dated before `last_date` and those on `last_date` for a
+        symbol in `last_symbols`, so re-feeding an overlapping range is
+        harmless. `recorder` only receives marks and trades from here on.
+
+        Raises:
+            ValueError: if the checkpoint was written by another engine
+                version or for a differently configured strategy.
+        """
+        if checkpoint.engine_version != ENGINE_VERSION:
+            raise ValueError("checkpoint was written by another engine version")
+        if (
+            checkpoint.strategy != _strategy_name(strategy)
+            or checkpoint.params != strategy.params()
+        ):
+            raise ValueError("checkpoint does not match the strategy")
+
+        session = cls(
+            strategy,
+            initial_cash=checkpoint.initial_cash,
+            risk_limits=checkpoint.risk_limits,
+            recorder=recorder,
+        )
+        session.portfolio = checkpoint.portfolio.model_copy(deep=True)
+        if checkpoint.risk_limits is not None and checkpoint.risk_state is not None:
+            session.risk = RiskManager.from_snapshot(
+                checkpoint.risk_limits, checkpoint.risk_state
+            )
+            session._portfolio_engine = PortfolioEngine(risk=session.risk)
+        session.windows = {
+            symbol: deque(candles, maxlen=strategy.lookback)
+            for symbol, candles in checkpoint.windows.items()
+        }
+        session.open_trades = {
+            symbol: trade.model_copy()
+            for symbol, trade in checkpoint.open_trades.items()
+        }
+        session.total_trades = checkpoint.total_trades
+        session.wins = checkpoint.wins
+        session.peak_equity = checkpoint.peak_equity
+        session.max_drawdown = checkpoint.max_drawdown
+        session.last_date = checkpoint.last_date
+        session.last_symbols = set(checkpoint.last_symbols)
+        if checkpoint.last_date is not None:
+            session._resumed_at = (checkpoint.last_date, set(checkpoint.last_symbols))
+        session.recorder.restore(checkpoint.recorder_state)
+        return session
 
-        portfolio_engine = PortfolioEngine()
-        equity_curve = []
-        trades = []
+    def checkpoint(self) -> BacktestCheckpoint:
+        """Capture the session state after the last fed candle."""
+        return BacktestCheckpoint(
+            engine_version=ENGINE_VERSION,
+            strategy=_strategy_name(self.strategy),
+            params=self.strategy.params(),
+            initial_cash=self.initial_cash,
+            risk_limits=self.risk_limits,
+            risk_state=self.risk.snapshot() if self.risk else None,
+            portfolio=self.portfolio.model_copy(deep=True),
+            windows={symbol: list(window) for symbol, window in self.windows.items()},
+            open_trades={
+                symbol: trade.model_copy() for symbol, trade in self.open_trades.items()
+            },
+            total_trades=self.total_trades,
+            wins=self.wins,
+            peak_equity=self.peak_equity,
+            max_drawdown=self.max_drawdown,
+            last_date=self.last_date,
+            last_symbols=sorted(self.last_symbols),
+            recorder_state=self.recorder.state(),
+        )
 
-        for i in range(len(data)):
-            slice_data = data[: i + 1]
-            candle = data[i]
+    def feed(self, candles: Iterable[OHLCV]) -> None:
+        """
+        Process candles in ascending date order.
 
-            try:
-                signal = strategy.generate_signal(slice_data)
-            except ValueError:
-                equity_curve.append(portfolio.equity)
+        Every candle is processed, including several symbols on the same
+        date; only a session built by `restore()` skips candles its
+        checkpoint already covers.
+        """
+        for candle in candles:
+            if self._already_processed(candle):
                 continue
+            self._step(candle)
+            if candle.candle_date != self.last_date:
+                self.last_date = candle.candle_date
+                self.last_symbols = set()
+            self.last_symbols.add(candle.symbol)
+
+    def result(self) -> BacktestResult:
+        """Summarize the session so far; trades still open are included."""
+        trades = sorted(
+            [
+                *self.recorder.trades,
+                *(trade.model_copy() for trade in self.open_trades.values()),
+            ],
+            key=lambda t: t.entry_date,
+        )
+        return BacktestResult(
+            total_trades=self.total_trades,
+            total_pnl=self.portfolio.equity - self.initial_cash,
+            win_rate=(self.wins / self.total_trades) if self.total_trades else 0.0,
+            trades=trades,
+            equity_curve=list(self.recorder.equity_curve),
+            max_drawdown=self.max_drawdown,
+            halt_reason=self.risk.halt_reason if self.risk else None,
+        )
+
+    def close(self) -> None:
+        self.recorder.close()
+
+    def _already_processed(self, candle: OHLCV) -> bool:
+        if self._resumed_at is None:
+            return False
+        day, symbols = self._resumed_at
+        return candle.candle_date < day or (
+            candle.candle_date == day and candle.symbol in symbols
+        )
+
+    def _step(self, candle: OHLCV) -> None:
+        window = self.windows.get(candle.symbol)
+        if window is None:
+            window = self.windows[candle.symbol] = deque(maxlen=self.strategy.lookback)
+        window.append(candle)
 
-            portfolio_before = portfolio.model_copy(deep=True)
+        try:
+            signal = self.strategy.generate_signal(list(window))
+        except ValueError:
+            signal = None
 
-            portfolio = portfolio_engine.apply_signal(
-                portfolio=portfolio,
+        if signal is not None:
+            was_held = candle.symbol in self.portfolio.positions
+
+            self.portfolio = self._portfolio_engine.apply_signal(
+                portfolio=self.portfolio,
                 symbol=candle.symbol,
                 signal=signal.signal,
                 price=candle.close,
                 date=candle.candle_date,
             )
 
-            # Detect executed trades
-            if (
-                signal.signal.name == "BUY"
-                and candle.symbol not in portfolio_before.positions
-                and candle.symbol in portfolio.positions
-            ):
-                trades.append(
-                    Trade(
-                        symbol=candle.symbol,
-                        entry_date=candle.candle_date,
-                        entry_price=candle.close,
-                    )
+            # Detect executed trades. Exits are detected from the positions
+            # rather than the signal since the risk layer may force them.
+            if not was_held and candle.symbol in self.portfolio.positions:
+                self.open_trades[candle.symbol] = Trade(
+                    symbol=candle.symbol,
+                    entry_date=candle.candle_date,
+                    entry_price=candle.close,
                 )
+                self.total_trades += 1
 
-            elif (
-                signal.signal.name == "SELL"
-                and candle.symbol in portfolio_before.positions
-                and candle.symbol not in portfolio.positions
-            ):
-                last_trade = trades[-1]
-                last_trade.exit_date = candle.candle_date
-                last_trade.exit_price = candle.close
-                last_trade.pnl = last_trade.exit_price - last_trade.entry_price
+            elif was_held and candle.symbol not in self.portfolio.positions:
+                trade = self.open_trades.pop(candle.symbol)
+                trade.exit_date = candle.candle_date
+                trade.exit_price = candle.close
+                trade.pnl = trade.exit_price - trade.entry_price
+                if trade.pnl > 0:
+                    self.wins += 1
+                self.recorder.record_trade(trade)
 
-            equity_curve.append(portfolio.equity)
+        equity = self.portfolio.equity
+        if self.peak_equity is None or equity > self.peak_equity:
+            self.peak_equity = equity
+        self.max_drawdown = max(
+            self.max_drawdown, (self.peak_equity - equity) / self.peak_equity
+        )
+        self.recorder.record_equity(candle.candle_date, equity)
 
-        total_pnl = portfolio.equity - initial_cash
-        wins = len([t for t in trades if t.pnl and t.pnl > 0])
 
-        return BacktestResult(
-            total_trades=len(trades),
-            total_pnl=total_pnl,
-            win_rate=(wins / len(trades)) if trades else 0.0,
-            trades=trades,
-            equity_curve=equity_curve,
-            max_drawdown=max_drawdown(equity_curve),
+class BacktestEngine:
+    """
+    Portfolio-aware backtesting engine.
+
+    When `risk_limits` is given, a fresh `RiskManager` guards every run.
+    """
+
+    def __init__(self, risk_limits: RiskLimits | None = None):
+        self.risk_limits = risk_limits
+
+    def run(
+        self,
+        data: List[OHLCV],
+        strategy: SignalStrategy,
+        initial_cash: float = 100_000,
+    ) -> BacktestResult:
+        return self.run_stream(
+            candles=data,
+            strategy=strategy,
+            initial_cash=initial_cash,
+            recorder=MemoryRecorder(),
+        )
+
+    def session(
+        self,
+        strategy: SignalStrategy,
+        initial_cash: float = 100_000,
+        recorder: BacktestRecorder | None = None,
+    ) -> BacktestSession:
+        """Start an incremental session using this engine's risk limits."""
+        return BacktestSession(
+            strategy,
+            initial_cash=initial_cash,
+            risk_limits=self.risk_limits,
+            recorder=recorder,
         )
+
+    def run_stream(
+        self,
+        candles: Iterable[OHLCV],
+        strategy: SignalStrategy,
+        initial_cash: float = 100_000,
+        recorder: BacktestRecorder | None = None,
+    ) -> BacktestResult:
+        """Run a backtest over an iterable of candles in bounded memory.
+
+        Only the strategy's `lookback` window of candles is kept per symbol,
+        and each symbol's signals see only that symbol's candles; the equity
+        curve and trades go to `recorder`, and drawdown and win counts are
+        tracked as running values. Combine with
+        `app.market.stream.iter_daily_ohlcv` to pull long histories from a
+        provider chunk by chunk:
+
+            candles = iter_daily_ohlcv(provider, "AAPL", start, end)
+            engine.run_stream(candles, strategy, recorder=FileRecorder("out"))
+
+        Args:
+            candles: Candles in ascending date order; consumed once.
+            strategy: The strategy generating signals.
+            initial_cash: Starting cash.
+            recorder: Sink for equity and trades. Defaults to a
+                `MemoryRecorder` bounded to 10,000 equity points and the
+                10,000 most recent closed trades, so peak memory does not
+                grow with history; pass a `FileRecorder` to keep everything.
+
+        Returns:
+            BacktestResult: Equity curve and closed trades are whatever the
+            recorder keeps; open trades are always included.
+        """
+        session = self.session(strategy, initial_cash=initial_cash, recorder=recorder)
+        session.feed(candles)
+        session.close()
+        return session.result()
+
+    def resume(
+        self,
+        checkpoint: BacktestCheckpoint,
+        candles: Iterable[OHLCV],
+        strategy: SignalStrategy,
+        recorder: BacktestRecorder | None = None,
+    ) -> Tuple[BacktestResult, BacktestCheckpoint]:
+        """Continue a checkpointed backtest with newly arrived candles.
+
+        The checkpoint holds only running state and the strategy's lookback
+        windows, so the cost is proportional to the new candles only.
+        Candles the checkpoint already covers are skipped. Totals, win rate,
+        drawdown and open trades match a full rerun; the equity curve and
+        closed trades are not carried in the checkpoint, so `recorder` only
+        sees those produced by `candles`. To keep the whole history, pass an
+        append-only sink such as a `FileRecorder` on the same directory each
+        time:
+
+            session = engine.session(strategy, recorder=FileRecorder("out"))
+            session.feed(history)
+            session.close()
+            checkpoint = session.checkpoint()
+            ...
+            result, checkpoint = engine.resume(
+                checkpoint, new_candles, strategy, recorder=FileRecorder("out")
+            )
+
+        Returns:
+            A `(result, checkpoint)` tuple; store the new checkpoint for the
+            next update.
+        """
+        session = BacktestSession.restore(checkpoint, strategy, recorder=recorder)
+        session.feed(candles)
+        session.close()
+        return session.result(), session.checkpoint()
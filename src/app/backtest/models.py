@@ -1,6 +1,10 @@
 from datetime import date
 from pydantic import BaseModel, Field
-from typing import List
+from typing import Any, Dict, List
+
+from app.market.models import OHLCV
+from app.portfolio.models import Portfolio
+from app.portfolio.risk import RiskLimits, RiskState
 
 
 class Trade(BaseModel):
@@ -38,3 +42,53 @@ class BacktestResult(BaseModel):
     max_drawdown: float = Field(
         description="The maximum drawdown experienced during the backtest."
     )
+    halt_reason: str | None = Field(
+        default=None,
+        description="Why the risk layer halted trading, if it did.",
+    )
+
+
+class SweepResult(BaseModel):
+    """A model summarizing one parameter combination of a sweep."""
+
+    symbol: str = Field(description="The stock symbol the combination was run on.")
+    params: Dict[str, int] = Field(
+        description="Strategy parameters used for this combination."
+    )
+    total_trades: int = Field(description="The total number of trades executed.")
+    total_pnl: float = Field(description="The total profit or loss.")
+    win_rate: float = Field(description="The percentage of winning trades.")
+    max_drawdown: float = Field(description="The maximum drawdown experienced.")
+
+
+class BacktestCheckpoint(BaseModel):
+    """A model holding everything needed to resume a backtest."""
+
+    engine_version: str = Field(description="Engine version that wrote the checkpoint.")
+    strategy: str = Field(description="Qualified class name of the strategy.")
+    params: Dict[str, Any] = Field(description="Parameters of the strategy.")
+    initial_cash: float = Field(description="Starting cash of the backtest.")
+    risk_limits: RiskLimits | None = Field(
+        default=None, description="Risk limits in force, if any."
+    )
+    risk_state: RiskState | None = Field(
+        default=None, description="Running state of the risk manager, if any."
+    )
+    portfolio: Portfolio = Field(description="Portfolio after the last candle.")
+    windows: Dict[str, List[OHLCV]] = Field(
+        description="The strategy's lookback window of most recent candles per symbol."
+    )
+    open_trades: Dict[str, Trade] = Field(description="Trades not yet exited.")
+    total_trades: int = Field(description="Trades entered so far.")
+    wins: int = Field(description="Closed trades with a positive PnL.")
+    peak_equity: float | None = Field(description="Highest equity seen so far.")
+    max_drawdown: float = Field(description="Maximum drawdown seen so far.")
+    last_date: date | None = Field(description="Date of the last processed candle.")
+    last_symbols: List[str] = Field(
+        default_factory=list,
+        description="Symbols already processed on `last_date`.",
+    )
+    recorder_state: Dict[str, Any] = Field(
+        default_factory=dict,
+        description="Constant-size recorder settings (no curve or trades).",
+    )
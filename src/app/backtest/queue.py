@@ -0,0 +1,454 @@
+"""Distributing sweeps across processes and hosts through a work queue.
+
+A sweep over many symbols and parameter combinations is split into
+shards (`SweepTask`: one symbol and a slice of the parameter grid) and
+pushed onto a `WorkQueue`. Any number of workers, on one box or several,
+lease shards, renew the lease with heartbeats while they run, and write
+their `SweepResult` rows back. A lease that is not renewed in time
+expires and the shard goes back to pending for another worker; a shard
+that keeps failing is marked failed after `max_attempts` leases.
+
+`WorkQueue` is the extension point for other backends (e.g. a networked
+broker). `SQLiteWorkQueue` is the built-in one: a single database file
+that several processes, or hosts on a filesystem with working POSIX
+locks, can share.
+
+Run a worker with:
+
+    python -m app.backtest.queue worker --db sweeps.db
+"""
+
+import argparse
+import json
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import date
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Sequence
+
+from pydantic import BaseModel, Field
+
+from app.backtest.cache import BacktestCache
+from app.backtest.models import SweepResult
+from app.backtest.sweep import evaluate, expand_grid, rank_results
+from app.logging import get_logger
+from app.market.base import MarketDataProvider
+from app.market.cache import CandleCache
+
+logger = get_logger(__name__)
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS tasks (
+        task_id TEXT PRIMARY KEY,
+        sweep_id TEXT NOT NULL,
+        payload TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'pending',
+        worker_id TEXT,
+        lease_expires REAL,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        error TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status)",
+    """
+    CREATE TABLE IF NOT EXISTS results (
+        task_id TEXT NOT NULL,
+        sweep_id TEXT NOT NULL,
+        payload TEXT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS results_sweep ON results (sweep_id)",
+)
+
+
+class SweepTask(BaseModel):
+    """A model describing one shard of a distributed sweep."""
+
+    task_id: str = Field(description="Unique identifier of the shard.")
+    sweep_id: str = Field(description="Identifier of the sweep the shard belongs to.")
+    symbol: str = Field(description="The stock symbol to backtest.")
+    start: date = Field(description="Inclusive start date of the history.")
+    end: date = Field(description="Exclusive end date of the history.")
+    combos: List[Dict[str, int]] = Field(
+        description="Strategy parameter combinations evaluated by this shard."
+    )
+    initial_cash: float = Field(description="Starting cash for each backtest.")
+
+
+class SweepStatus(BaseModel):
+    """A model counting the shards of a sweep by state."""
+
+    pending: int = Field(description="Shards waiting for a worker.")
+    leased: int = Field(description="Shards currently held by a worker.")
+    done: int = Field(description="Shards with results.")
+    failed: int = Field(description="Shards that exhausted their attempts.")
+
+
+class SweepIncompleteError(RuntimeError):
+    """Raised when collecting a sweep whose shards are not all done."""
+
+    def __init__(self, sweep_id: str, status: SweepStatus):
+        super().__init__(
+            f"sweep {sweep_id} is incomplete: {status.pending} pending, "
+            f"{status.leased} leased, {status.failed} failed"
+        )
+        self.sweep_id = sweep_id
+        self.status = status
+
+
+class WorkQueue(ABC):
+    """Backend-agnostic interface for sharded sweep work."""
+
+    @abstractmethod
+    def enqueue(self, tasks: Sequence[SweepTask]) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def lease(self, worker_id: str, lease_seconds: float) -> SweepTask | None:
+        """Claim the next pending shard, re-queueing expired leases first."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def heartbeat(self, task_id: str, worker_id: str, lease_seconds: float) -> bool:
+        """Extend a lease; False means the worker no longer holds it."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def complete(
+        self, task_id: str, worker_id: str, results: Sequence[SweepResult]
+    ) -> bool:
+        """Store results and mark done; ignored if the lease was lost."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def fail(self, task_id: str, worker_id: str, error: str) -> None:
+        """Release a shard after an error so it can be retried."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def status(self, sweep_id: str) -> SweepStatus:
+        raise NotImplementedError
+
+    @abstractmethod
+    def results(self, sweep_id: str) -> List[SweepResult]:
+        raise NotImplementedError
+
+
+class SQLiteWorkQueue(WorkQueue):
+    """`WorkQueue` stored in one SQLite file shared by all workers.
+
+    Each operation opens its own connection and takes the write lock up
+    front (`BEGIN IMMEDIATE`), so the queue is safe to use from several
+    threads and processes at once.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        max_attempts: int = 3,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = Path(path)
+        self.max_attempts = max_attempts
+        self._clock = clock
+        with self._transaction() as db:
+            for statement in _SCHEMA:
+                db.execute(statement)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                yield db
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+            db.execute("COMMIT")
+        finally:
+            db.close()
+
+    def enqueue(self, tasks: Sequence[SweepTask]) -> None:
+        with self._transaction() as db:
+            db.executemany(
+                "INSERT INTO tasks (task_id, sweep_id, payload) VALUES (?, ?, ?)",
+                [(t.task_id, t.sweep_id, t.model_dump_json()) for t in tasks],
+            )
+
+    def lease(self, worker_id: str, lease_seconds: float) -> SweepTask | None:
+        now = self._clock()
+        with self._transaction() as db:
+            db.execute(
+                "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' "
+                "ELSE 'pending' END, worker_id = NULL, "
+                "error = COALESCE(error, 'lease expired') "
+                "WHERE status = 'leased' AND lease_expires < ?",
+                (self.max_attempts, now),
+            )
+            row = db.execute(
+                "SELECT task_id, payload FROM tasks WHERE status = 'pending' "
+                "ORDER BY rowid LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            db.execute(
+                "UPDATE tasks SET status = 'leased', worker_id = ?, "
+                "lease_expires = ?, attempts = attempts + 1 WHERE task_id = ?",
+                (worker_id, now + lease_seconds, row[0]),
+            )
+        return SweepTask.model_validate_json(row[1])
+
+    def heartbeat(self, task_id: str, worker_id: str, lease_seconds: float) -> bool:
+        with self._transaction() as db:
+            cursor = db.execute(
+                "UPDATE tasks SET lease_expires = ? WHERE task_id = ? "
+                "AND worker_id = ? AND status = 'leased'",
+                (self._clock() + lease_seconds, task_id, worker_id),
+            )
+            return cursor.rowcount == 1
+
+    def complete(
+        self, task_id: str, worker_id: str, results: Sequence[SweepResult]
+    ) -> bool:
+        with self._transaction() as db:
+            cursor = db.execute(
+                "UPDATE tasks SET status = 'done', lease_expires = NULL "
+                "WHERE task_id = ? AND worker_id = ? AND status = 'leased'",
+                (task_id, worker_id),
+            )
+            if cursor.rowcount != 1:
+                return False
+            sweep_id = db.execute(
+                "SELECT sweep_id FROM tasks WHERE task_id = ?", (task_id,)
+            ).fetchone()[0]
+            db.executemany(
+                "INSERT INTO results (task_id, sweep_id, payload) VALUES (?, ?, ?)",
+                [(task_id, sweep_id, r.model_dump_json()) for r in results],
+            )
+            return True
+
+    def fail(self, task_id: str, worker_id: str, error: str) -> None:
+        with self._transaction() as db:
+            db.execute(
+                "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' "
+                "ELSE 'pending' END, worker_id = NULL, lease_expires = NULL, "
+                "error = ? WHERE task_id = ? AND worker_id = ? AND status = 'leased'",
+                (self.max_attempts, error, task_id, worker_id),
+            )
+
+    def status(self, sweep_id: str) -> SweepStatus:
+        with self._transaction() as db:
+            counts = dict(
+                db.execute(
+                    "SELECT status, COUNT(*) FROM tasks WHERE sweep_id = ? "
+                    "GROUP BY status",
+                    (sweep_id,),
+                ).fetchall()
+            )
+        return SweepStatus(
+            pending=counts.get("pending", 0),
+            leased=counts.get("leased", 0),
+            done=counts.get("done", 0),
+            failed=counts.get("failed", 0),
+        )
+
+    def results(self, sweep_id: str) -> List[SweepResult]:
+        with self._transaction() as db:
+            rows = db.execute(
+                "SELECT payload FROM results WHERE sweep_id = ?", (sweep_id,)
+            ).fetchall()
+        return [SweepResult.model_validate_json(row[0]) for row in rows]
+
+
+def submit_sweep(
+    queue: WorkQueue,
+    symbols: Sequence[str],
+    start: date,
+    end: date,
+    grid: Dict[str, Sequence[int]],
+    shard_size: int = 16,
+    initial_cash: float = 100_000,
+) -> str:
+    """Split a multi-symbol sweep into shards and enqueue them.
+
+    Returns:
+        The sweep id to pass to `collect_sweep`.
+    """
+    if shard_size <= 0:
+        raise ValueError("shard_size must be positive")
+
+    sweep_id = uuid.uuid4().hex
+    combos = expand_grid(grid)
+    tasks = [
+        SweepTask(
+            task_id=f"{sweep_id}:{symbol}:{offset}",
+            sweep_id=sweep_id,
+            symbol=symbol,
+            start=start,
+            end=end,
+            combos=combos[offset : offset + shard_size],
+            initial_cash=initial_cash,
+        )
+        for symbol in symbols
+        for offset in range(0, len(combos), shard_size)
+    ]
+    queue.enqueue(tasks)
+    logger.info(
+        "Submitted sweep",
+        extra={"sweep_id": sweep_id, "shards": len(tasks), "combos": len(combos)},
+    )
+    return sweep_id
+
+
+def collect_sweep(
+    queue: WorkQueue, sweep_id: str, allow_partial: bool = False
+) -> List[SweepResult]:
+    """Merge every shard's results into one ranked table.
+
+    Args:
+        queue: The shared work queue.
+        sweep_id: Id returned by `submit_sweep`.
+        allow_partial: Rank whatever results exist even if some shards are
+            pending, leased or failed.
+
+    Raises:
+        SweepIncompleteError: if any shard is not done and `allow_partial`
+            is False; its `status` tells which.
+    """
+    status = queue.status(sweep_id)
+    if not allow_partial and status.pending + status.leased + status.failed > 0:
+        raise SweepIncompleteError(sweep_id, status)
+    return rank_results(queue.results(sweep_id))
+
+
+def run_worker(
+    queue: WorkQueue,
+    provider: MarketDataProvider,
+    worker_id: str | None = None,
+    lease_seconds: float = 60.0,
+    idle_timeout: float | None = None,
+    poll_interval: float = 1.0,
+    cache: BacktestCache | None = None,
+) -> int:
+    """Lease and process shards until the queue stays empty.
+
+    A background thread renews the lease every `lease_seconds / 3`. If a
+    renewal fails (the lease expired and another worker took the shard),
+    the shard is abandoned without writing results.
+
+    Args:
+        queue: The shared work queue.
+        provider: Market data source; wrapped in a `CandleCache` so shards
+            of the same symbol fetch history once per worker.
+        worker_id: Identifier recorded on leases. Defaults to host:uuid.
+        lease_seconds: Lease length granted per lease and heartbeat.
+        idle_timeout: How long to keep polling an empty queue before
+            returning; 0 returns as soon as nothing is pending. Defaults to
+            twice `lease_seconds`, so a shard leased by a crashed worker is
+            re-queued (on a later `lease()`) before the survivors exit.
+        poll_interval: Sleep between polls of an empty queue.
+        cache: Backtest result cache; combinations already run on the same
+            data and code are not rerun. Defaults to an in-memory cache
+            for this worker; pass one with a `directory` to share results
+            across workers and restarts.
+
+    Returns:
+        The number of shards this worker completed.
+    """
+    worker_id = worker_id or f"{socket.gethostname()}:{uuid.uuid4().hex[:8]}"
+    if idle_timeout is None:
+        idle_timeout = 2 * lease_seconds
+    candles = CandleCache(provider)
+    cache = cache if cache is not None else BacktestCache()
+    completed = 0
+    idle_since = time.monotonic()
+
+    while True:
+        task = queue.lease(worker_id, lease_seconds)
+        if task is None:
+            if time.monotonic() - idle_since >= idle_timeout:
+                return completed
+            time.sleep(poll_interval)
+            continue
+
+        idle_since = time.monotonic()
+        lost = threading.Event()
+        done = threading.Event()
+
+        def beat(task_id: str = task.task_id) -> None:
+            while not done.wait(lease_seconds / 3):
+                if not queue.heartbeat(task_id, worker_id, lease_seconds):
+                    lost.set()
+                    return
+
+        heartbeat = threading.Thread(target=beat, daemon=True)
+        heartbeat.start()
+        try:
+            data = candles.get_daily_ohlcv(task.symbol, task.start, task.end)
+            results = []
+            for params in task.combos:
+                if lost.is_set():
+                    break
+                result = evaluate(data, params, task.initial_cash, cache=cache)
+                if result is not None:
+                    results.append(result.model_copy(update={"symbol": task.symbol}))
+        except Exception as exc:
+            logger.exception("Shard failed", extra={"task_id": task.task_id})
+            queue.fail(task.task_id, worker_id, repr(exc))
+            continue
+        finally:
+            done.set()
+            heartbeat.join()
+
+        if lost.is_set() or not queue.complete(task.task_id, worker_id, results):
+            logger.warning(
+                "Lease lost, shard abandoned", extra={"task_id": task.task_id}
+            )
+        else:
+            completed += 1
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    """Command line entry point: `worker` processes shards from a queue."""
+    from app.config import get_settings
+    from app.logging import configure_logging
+    from app.market.registry import build_provider
+
+    parser = argparse.ArgumentParser(prog="python -m app.backtest.queue")
+    commands = parser.add_subparsers(dest="command", required=True)
+    worker = commands.add_parser("worker", help="process sweep shards")
+    worker.add_argument("--db", required=True, help="path to the SQLite queue")
+    worker.add_argument("--lease-seconds", type=float, default=60.0)
+    worker.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=None,
+        help="seconds to wait on an empty queue (default: twice the lease)",
+    )
+    worker.add_argument(
+        "--cache-dir",
+        default=None,
+        help="directory of a backtest result cache shared between workers",
+    )
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    completed = run_worker(
+        SQLiteWorkQueue(args.db),
+        build_provider(get_settings().market_provider),
+        lease_seconds=args.lease_seconds,
+        idle_timeout=args.idle_timeout,
+        cache=BacktestCache(directory=args.cache_dir),
+    )
+    print(json.dumps({"completed": completed}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""Sinks for the equity curve and trades produced by a backtest.
+
+`BacktestEngine` hands every equity mark and every finished trade to a
+recorder instead of accumulating them itself, so the memory a run needs
+is decided by the recorder:
+
+- `MemoryRecorder` keeps everything (the default for `run`), or a
+  decimated curve bounded by `max_points` and the most recent
+  `max_trades` trades (the default for `run_stream`).
+- `FileRecorder` appends to a CSV/JSONL pair on disk and keeps nothing.
+"""
+
+import json
+from collections import deque
+from abc import ABC, abstractmethod
+from datetime import date
+from pathlib import Path
+from typing import Any, Deque, Dict, List
+
+from app.backtest.models import Trade
+
+
+class BacktestRecorder(ABC):
+    """Receives equity marks and trades as a backtest progresses."""
+
+    @abstractmethod
+    def record_equity(self, candle_date: date, equity: float) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def record_trade(self, trade: Trade) -> None:
+        """Called once per trade, when it closes."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Flush and release resources; called once at the end of a run."""
+
+    def state(self) -> Dict[str, Any]:
+        """Constant-size settings to store in a checkpoint (JSON-serializable).
+
+        Recorded equity points and trades are never included, so
+        checkpoints stay small however long the history is.
+        """
+        return {}
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        """Reload settings produced by `state()` when resuming."""
+
+    @property
+    def equity_curve(self) -> List[float]:
+        """Equity points to place on the `BacktestResult` (may be empty)."""
+        return []
+
+    @property
+    def trades(self) -> List[Trade]:
+        """Trades to place on the `BacktestResult` (may be empty)."""
+        return []
+
+
+class MemoryRecorder(BacktestRecorder):
+    """
+    Keeps the equity curve and trades in memory.
+
+    With `max_points`, the curve is decimated whenever it grows past the
+    limit: every other point is dropped and the sampling stride doubles,
+    so memory stays bounded however long the run is. With `max_trades`,
+    only the most recent closed trades are kept. A resumed recorder
+    keeps the sampling stride but starts with an empty curve and trade list.
+    """
+
+    def __init__(
+        self,
+        max_points: int | None = None,
+        keep_trades: bool = True,
+        max_trades: int | None = None,
+    ):
+        if max_points is not None and max_points < 2:
+            raise ValueError("max_points must be at least 2")
+        self.max_points = max_points
+        self.keep_trades = keep_trades
+        self.max_trades = max_trades
+        self.stride = 1
+        self._seen = 0
+        self._curve: List[float] = []
+        self._trades: Deque[Trade] = deque(maxlen=max_trades)
+
+    def record_equity(self, candle_date: date, equity: float) -> None:
+        if self._seen % self.stride == 0:
+            self._curve.append(equity)
+            if self.max_points is not None and len(self._curve) > self.max_points:
+                self._curve = self._curve[::2]
+                self.stride *= 2
+        self._seen += 1
+
+    def record_trade(self, trade: Trade) -> None:
+        if self.keep_trades:
+            self._trades.append(trade)
+
+    @property
+    def equity_curve(self) -> List[float]:
+        return self._curve
+
+    @property
+    def trades(self) -> List[Trade]:
+        return list(self._trades)
+
+    def state(self) -> Dict[str, Any]:
+        return {
+            "max_points": self.max_points,
+            "keep_trades": self.keep_trades,
+            "max_trades": self.max_trades,
+            "stride": self.stride,
+            "seen": self._seen,
+        }
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        if not state:
+            return
+        self.max_points = state["max_points"]
+        self.keep_trades = state["keep_trades"]
+        self.max_trades = state.get("max_trades")
+        self._trades = deque(maxlen=self.max_trades)
+        self.stride = state["stride"]
+        self._seen = state["seen"]
+
+
+class FileRecorder(BacktestRecorder):
+    """
+    Streams the equity curve to `equity.csv` and trades to `trades.jsonl`.
+
+    Files are opened in append mode so a resumed run keeps extending them;
+    nothing is stored in checkpoints.
+    """
+
+    def __init__(self, directory: str | Path):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.equity_path = self.directory / "equity.csv"
+        self.trades_path = self.directory / "trades.jsonl"
+        self._equity = self.equity_path.open("a")
+        self._trades = self.trades_path.open("a")
+
+    def record_equity(self, candle_date: date, equity: float) -> None:
+        self._equity.write(f"{candle_date.isoformat()},{equity!r}\n")
+
+    def record_trade(self, trade: Trade) -> None:
+        self._trades.write(json.dumps(trade.model_dump(mode="json")) + "\n")
+
+    def close(self) -> None:
+        self._equity.close()
+        self._trades.close()
@@ -0,0 +1,168 @@
+"""Parameter sweeps of `SwingSMARsiStrategy` over one candle series.
+
+Each combination of the grid is an independent backtest, so the sweep
+fans out over any `concurrent.futures.Executor` (a warm process pool in
+the MCP server) and ranks the summaries by PnL, then by drawdown.
+Combinations the strategy rejects (e.g. `short_window >= long_window`)
+are skipped. With a `BacktestCache`, combinations already run on the same
+data and code are answered from the cache, so repeating a sweep on
+unchanged inputs returns without running any backtest.
+"""
+
+import itertools
+import threading
+from concurrent.futures import FIRST_COMPLETED, CancelledError, Executor, wait
+from typing import Dict, List, Sequence
+
+from app.backtest.cache import BacktestCache, backtest_cache_key, data_fingerprint
+from app.backtest.engine import BacktestEngine
+from app.backtest.models import BacktestResult, SweepResult
+from app.market.models import OHLCV
+from app.signals.swing_sma_rsi import SwingSMARsiStrategy
+
+
+def expand_grid(grid: Dict[str, Sequence[int]]) -> List[Dict[str, int]]:
+    """Expand `{"short_window": [5, 10], ...}` into every combination."""
+    names = sorted(grid)
+    return [
+        dict(zip(names, values))
+        for values in itertools.product(*(grid[name] for name in names))
+    ]
+
+
+def _strategy(params: Dict[str, int]) -> SwingSMARsiStrategy | None:
+    try:
+        return SwingSMARsiStrategy(**params)
+    except ValueError:
+        return None
+
+
+def _backtest(
+    data: List[OHLCV], params: Dict[str, int], initial_cash: float
+) -> BacktestResult:
+    return BacktestEngine().run(
+        data=data, strategy=SwingSMARsiStrategy(**params), initial_cash=initial_cash
+    )
+
+
+def _summary(
+    data: List[OHLCV], params: Dict[str, int], result: BacktestResult
+) -> SweepResult:
+    return SweepResult(
+        symbol=data[0].symbol if data else "",
+        params=params,
+        total_trades=result.total_trades,
+        total_pnl=result.total_pnl,
+        win_rate=result.win_rate,
+        max_drawdown=result.max_drawdown,
+    )
+
+
+def evaluate(
+    data: List[OHLCV],
+    params: Dict[str, int],
+    initial_cash: float = 100_000,
+    cache: BacktestCache | None = None,
+) -> SweepResult | None:
+    """Backtest one combination; returns None if the parameters are invalid.
+
+    With `cache`, an unchanged combination is answered from the cache.
+    """
+    strategy = _strategy(params)
+    if strategy is None:
+        return None
+
+    engine = BacktestEngine()
+    if cache is None:
+        result = engine.run(data=data, strategy=strategy, initial_cash=initial_cash)
+    else:
+        result = cache.run(engine, data, strategy, initial_cash)
+    return _summary(data, params, result)
+
+
+def rank_results(results: List[SweepResult]) -> List[SweepResult]:
+    """Order by PnL (descending), breaking ties by lower drawdown.
+
+    Remaining ties are ordered by symbol and parameters so that merging
+    shards from different workers always yields the same table.
+    """
+    return sorted(
+        results,
+        key=lambda r: (
+            -r.total_pnl,
+            r.max_drawdown,
+            r.symbol,
+            sorted(r.params.items()),
+        ),
+    )
+
+
+def run_sweep(
+    data: List[OHLCV],
+    grid: Dict[str, Sequence[int]],
+    initial_cash: float = 100_000,
+    executor: Executor | None = None,
+    cancel: threading.Event | None = None,
+    cache: BacktestCache | None = None,
+) -> List[SweepResult]:
+    """Run every combination of `grid` over `data` and rank the results.
+
+    Args:
+        data: Candles shared by every combination.
+        grid: Strategy keyword arguments mapped to candidate values.
+        initial_cash: Starting cash for each backtest.
+        executor: Optional executor to fan out over; runs inline if None.
+        cancel: Optional event; when set, pending work is abandoned.
+        cache: Optional result cache. Cached combinations are answered
+            without running; only misses are run (or sent to `executor`)
+            and their results are stored here, in the calling process.
+
+    Raises:
+        CancelledError: if `cancel` is set before the sweep finishes.
+    """
+    combos = expand_grid(grid)
+    engine = BacktestEngine()
+    digest = data_fingerprint(data) if cache is not None else None
+    results: Dict[int, SweepResult] = {}
+    misses: Dict[int, str | None] = {}
+
+    for i, params in enumerate(combos):
+        strategy = _strategy(params)
+        if strategy is None:
+            continue
+        key = None
+        if cache is not None:
+            key = backtest_cache_key(
+                engine, data, strategy, initial_cash, data_digest=digest
+            )
+            hit = cache.get(key)
+            if hit is not None:
+                results[i] = _summary(data, combos[i], hit)
+                continue
+        misses[i] = key
+
+    def store(i: int, result: BacktestResult) -> None:
+        if cache is not None:
+            cache.put(misses[i], result)
+        results[i] = _summary(data, combos[i], result)
+
+    if executor is None:
+        for i in misses:
+            if cancel is not None and cancel.is_set():
+                raise CancelledError()
+            store(i, _backtest(data, combos[i], initial_cash))
+    else:
+        futures = {
+            i: executor.submit(_backtest, data, combos[i], initial_cash) for i in misses
+        }
+        pending = set(futures.values())
+        while pending:
+            if cancel is not None and cancel.is_set():
+                for future in pending:
+                    future.cancel()
+                raise CancelledError()
+            _, pending = wait(pending, timeout=0.05, return_when=FIRST_COMPLETED)
+        for i, future in futures.items():
+            store(i, future.result())
+
+    return rank_results(list(results.values()))
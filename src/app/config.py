@@ -26,6 +26,13 @@ class Settings(BaseModel):
     enable_backtesting: bool = Field(
         default=True, description="Flag to enable or disable backtesting features."
     )
+    market_provider: str = Field(
+        default="yahoo", description="Market data provider to use (yahoo, mock)."
+    )
+    worker_processes: int = Field(
+        default=os.cpu_count() or 1,
+        description="Worker processes kept warm for sweeps.",
+    )
 
 
 @lru_cache
@@ -39,4 +46,6 @@ def get_settings() -> Settings:
     return Settings(
         environment=os.getenv("ENVIRONMENT", "dev"),
         log_level=os.getenv("LOG_LEVEL", "INFO"),
+        market_provider=os.getenv("MARKET_PROVIDER", "yahoo"),
+        worker_processes=int(os.getenv("WORKER_PROCESSES", os.cpu_count() or 1)),
     )
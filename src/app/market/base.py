@@ -4,6 +4,9 @@ This module defines the `MarketDataProvider` abstract base class which
 standardizes how market data providers should expose daily OHLCV data to
 the application. Implementations (e.g. Yahoo, mock providers) should
 subclass `MarketDataProvider` and implement the `get_daily_ohlcv` method.
+Providers that know about splits and dividends may also override
+`get_corporate_actions` so callers can adjust raw prices themselves, and
+`get_history` when candles and actions come back from one request.
 
 The goal is to keep provider implementations interchangeable so the
 rest of the codebase can request market candles via a single, stable
@@ -12,9 +15,9 @@ interface.
 
 from abc import ABC, abstractmethod
 from datetime import date
-from typing import List
+from typing import List, Tuple
 
-from app.market.models import OHLCV
+from app.market.models import OHLCV, CorporateAction
 
 
 class MarketDataProvider(ABC):
@@ -56,3 +59,44 @@ class MarketDataProvider(ABC):
               concrete provider implementation.
         """
         raise NotImplementedError
+
+    def get_corporate_actions(
+        self,
+        symbol: str,
+        start: date,
+        end: date,
+    ) -> List[CorporateAction]:
+        """Fetch splits and cash dividends for `symbol` between `start` and `end`.
+
+        Args:
+            symbol: Ticker symbol to fetch, e.g. "AAPL".
+            start: Inclusive start date for the request.
+            end: Exclusive end date for the request.
+
+        Returns:
+            A list of `CorporateAction` models ordered by ex-date (ascending).
+            The default implementation returns an empty list for providers
+            that have no corporate action data.
+        """
+        return []
+
+    def get_history(
+        self,
+        symbol: str,
+        start: date,
+        end: date,
+    ) -> Tuple[List[OHLCV], List[CorporateAction]]:
+        """Fetch candles and corporate actions for the same range together.
+
+        The default implementation calls `get_daily_ohlcv` and
+        `get_corporate_actions`. Providers whose backend returns both in a
+        single response should override it so callers needing both (e.g.
+        `app.market.cache.CandleCache`) pay for one request.
+
+        Returns:
+            A `(candles, actions)` tuple, each ordered by date (ascending).
+        """
+        return (
+            self.get_daily_ohlcv(symbol, start, end),
+            self.get_corporate_actions(symbol, start, end),
+        )
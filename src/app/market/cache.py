@@ -0,0 +1,285 @@
+"""In-memory candle cache with raw and split/dividend-adjusted views.
+
+`CandleCache` wraps another `MarketDataProvider` and keeps, per symbol,
+the raw OHLCV columns as numpy arrays together with cumulative
+adjustment factors (see `app.market.adjustments`). Both views are served
+from the same cached arrays, so asking for adjusted prices never costs an
+extra fetch.
+
+Notes:
+- The cache remembers the covered `[start, end)` range per symbol and
+  only fetches the missing head or tail when a wider range is requested.
+  Candles and corporate actions come from one `get_history` call per
+  fetched range; candles outside it are dropped so cached dates stay
+  strictly increasing.
+- `add_corporate_action` updates the stored factors in place without
+  touching the wrapped provider.
+- Access is serialized per symbol, so one cache can be shared by
+  concurrent callers (e.g. the MCP server's tool calls): a slow fetch for
+  one symbol does not hold up reads or fetches for another.
+"""
+
+import threading
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Dict, List
+
+import numpy as np
+
+from app.logging import get_logger
+from app.market.adjustments import adjust, apply_action, cumulative_factors
+from app.market.base import MarketDataProvider
+from app.market.models import OHLCV, CorporateAction
+
+logger = get_logger(__name__)
+
+PRICE_COLUMNS = ("open", "high", "low", "close")
+
+
+@dataclass
+class _SymbolSeries:
+    """Cached raw columns and adjustment factors for one symbol."""
+
+    start: date
+    end: date
+    dates: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+    actions: List[CorporateAction] = field(default_factory=list)
+    price_factors: np.ndarray = field(init=False)
+    volume_factors: np.ndarray = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.refresh_factors()
+
+    def refresh_factors(self) -> None:
+        self.price_factors, self.volume_factors = cumulative_factors(
+            self.dates, self.close, self.actions
+        )
+
+    def span(self, start: date, end: date) -> slice:
+        lo = np.searchsorted(self.dates, np.datetime64(start, "D"), side="left")
+        hi = np.searchsorted(self.dates, np.datetime64(end, "D"), side="left")
+        return slice(int(lo), int(hi))
+
+
+def _columns(candles: List[OHLCV]) -> Dict[str, np.ndarray]:
+    return {
+        "dates": np.array([c.candle_date for c in candles], dtype="datetime64[D]"),
+        "open": np.array([c.open_price for c in candles], dtype=np.float64),
+        "high": np.array([c.high for c in candles], dtype=np.float64),
+        "low": np.array([c.low for c in candles], dtype=np.float64),
+        "close": np.array([c.close for c in candles], dtype=np.float64),
+        "volume": np.array([c.volume for c in candles], dtype=np.int64),
+    }
+
+
+def _within(candles: List[OHLCV], start: date, end: date) -> List[OHLCV]:
+    return [c for c in candles if start <= c.candle_date < end]
+
+
+def _check_increasing(symbol: str, dates: np.ndarray) -> None:
+    if dates.size > 1 and not np.all(dates[1:] > dates[:-1]):
+        raise ValueError(f"candles for {symbol} are not strictly increasing by date")
+
+
+def _action_key(action: CorporateAction) -> tuple:
+    return action.ex_date, action.action_type
+
+
+class CandleCache(MarketDataProvider):
+    """Caching provider exposing raw and adjusted views of the same data.
+
+    Example:
+        cache = CandleCache(YahooMarketDataProvider())
+        raw = cache.get_daily_ohlcv("AAPL", start, end)
+        adjusted = cache.get_daily_ohlcv("AAPL", start, end, adjusted=True)
+    """
+
+    def __init__(self, provider: MarketDataProvider):
+        self.provider = provider
+        self._series: Dict[str, _SymbolSeries] = {}
+        self._symbol_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get_daily_ohlcv(
+        self,
+        symbol: str,
+        start: date,
+        end: date,
+        adjusted: bool = False,
+    ) -> List[OHLCV]:
+        """Return cached candles, fetching only the uncovered part of the range.
+
+        Args:
+            symbol: Ticker symbol to fetch.
+            start: Inclusive start date.
+            end: Exclusive end date.
+            adjusted: Return split/dividend-adjusted prices instead of raw.
+
+        Returns:
+            A list of `OHLCV` models ordered by date (ascending).
+
+        Raises:
+            ValueError: if `start` > `end`.
+        """
+        columns = self.get_columns(symbol, start, end, adjusted=adjusted)
+
+        return [
+            OHLCV(
+                symbol=symbol,
+                candle_date=candle_date,
+                open_price=open_price,
+                high=high,
+                low=low,
+                close=close,
+                volume=volume,
+            )
+            for candle_date, open_price, high, low, close, volume in zip(
+                columns["dates"].tolist(),
+                columns["open"].tolist(),
+                columns["high"].tolist(),
+                columns["low"].tolist(),
+                columns["close"].tolist(),
+                columns["volume"].tolist(),
+            )
+        ]
+
+    def get_columns(
+        self,
+        symbol: str,
+        start: date,
+        end: date,
+        adjusted: bool = False,
+    ) -> Dict[str, np.ndarray]:
+        """Return the cached range as numpy columns.
+
+        The returned dict has `dates`, `open`, `high`, `low`, `close` and
+        `volume` arrays. Adjusted views are computed with one multiply per
+        column; raw views are copies of the cached arrays.
+        """
+        with self._symbol_lock(symbol):
+            series = self._ensure(symbol, start, end)
+            window = series.span(start, end)
+
+            columns = {"dates": series.dates[window].copy()}
+            factors = series.price_factors[window]
+            for name in PRICE_COLUMNS:
+                values = getattr(series, name)[window]
+                columns[name] = adjust(values, factors) if adjusted else values.copy()
+
+            volume = series.volume[window]
+            if adjusted:
+                volume = np.rint(adjust(volume, series.volume_factors[window]))
+            columns["volume"] = volume.astype(np.int64)
+        return columns
+
+    def get_corporate_actions(
+        self,
+        symbol: str,
+        start: date,
+        end: date,
+    ) -> List[CorporateAction]:
+        with self._symbol_lock(symbol):
+            series = self._ensure(symbol, start, end)
+            return [a for a in series.actions if start <= a.ex_date < end]
+
+    def get_adjustment_factors(self, symbol: str) -> np.ndarray:
+        """Return a copy of the cumulative price factors for a cached symbol.
+
+        Raises:
+            KeyError: if `symbol` has not been loaded yet.
+        """
+        with self._symbol_lock(symbol):
+            return self._series[symbol].price_factors.copy()
+
+    def add_corporate_action(self, action: CorporateAction) -> None:
+        """Record a new corporate action and update cached factors in place.
+
+        Actions already known for the same ex-date and type are ignored.
+        Symbols that are not cached yet are left alone; their actions are
+        picked up from the provider on first load.
+        """
+        with self._symbol_lock(action.symbol):
+            series = self._series.get(action.symbol)
+            if series is None:
+                return
+            if any(_action_key(a) == _action_key(action) for a in series.actions):
+                return
+
+            series.actions.append(action)
+            series.actions.sort(key=lambda a: a.ex_date)
+            apply_action(
+                series.dates,
+                series.close,
+                series.price_factors,
+                series.volume_factors,
+                action,
+            )
+
+    def _symbol_lock(self, symbol: str) -> threading.Lock:
+        with self._lock:
+            return self._symbol_locks.setdefault(symbol, threading.Lock())
+
+    def _ensure(self, symbol: str, start: date, end: date) -> _SymbolSeries:
+        if start > end:
+            raise ValueError("start must be <= end")
+
+        series = self._series.get(symbol)
+
+        if series is None:
+            candles, actions = self.provider.get_history(symbol, start, end)
+            columns = _columns(_within(candles, start, end))
+            _check_increasing(symbol, columns["dates"])
+            series = _SymbolSeries(
+                start=start, end=end, actions=list(actions), **columns
+            )
+            self._series[symbol] = series
+            return series
+
+        head: List[OHLCV] = []
+        tail: List[OHLCV] = []
+        new_actions: List[CorporateAction] = []
+        new_start, new_end = min(start, series.start), max(end, series.end)
+
+        if start < series.start:
+            candles, actions = self.provider.get_history(symbol, start, series.start)
+            head = _within(candles, start, series.start)
+            new_actions += actions
+        if end > series.end:
+            candles, actions = self.provider.get_history(symbol, series.end, end)
+            tail = _within(candles, series.end, end)
+            new_actions += actions
+
+        if not head and not tail and not new_actions:
+            series.start, series.end = new_start, new_end
+            return series
+
+        logger.debug(
+            "Extending cached candles",
+            extra={"symbol": symbol, "head": len(head), "tail": len(tail)},
+        )
+
+        head_columns, tail_columns = _columns(head), _columns(tail)
+        merged = {
+            name: np.concatenate(
+                [head_columns[name], getattr(series, name), tail_columns[name]]
+            )
+            for name in ("dates", *PRICE_COLUMNS, "volume")
+        }
+        _check_increasing(symbol, merged["dates"])
+
+        for name, values in merged.items():
+            setattr(series, name, values)
+        series.start, series.end = new_start, new_end
+        known = {_action_key(a) for a in series.actions}
+        for action in new_actions:
+            if _action_key(action) not in known:
+                known.add(_action_key(action))
+                series.actions.append(action)
+        series.actions.sort(key=lambda a: a.ex_date)
+        series.refresh_factors()
+        return series
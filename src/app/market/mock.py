@@ -1,5 +1,9 @@
-from datetime import date
-from typing import List
+import math
+import random
+import threading
+import time
+from datetime import date, timedelta
+from typing import Callable, List
 
 from app.market.base import MarketDataProvider
 from app.market.models import OHLCV
@@ -8,7 +12,66 @@ from app.market.models import OHLCV
 class MockMarketDataProvider(MarketDataProvider):
     """
     Deterministic provider for tests and backtests.
+
+    Returns one candle per calendar day in `[start, end)`, none when the
+    range is empty.
+    Prices follow a fixed wave keyed on the candle date, so overlapping
+    requests agree; on the anchor date 2024-01-01 the candle is
+    100/110/95/105.
+    """
+
+    anchor = date(2024, 1, 1)
+
+    def get_daily_ohlcv(
+        self,
+        symbol: str,
+        start: date,
+        end: date,
+    ) -> List[OHLCV]:
+        candles = []
+        for i in range((end - start).days):
+            candle_date = start + timedelta(days=i)
+            wave = 10.0 * math.sin((candle_date - self.anchor).days / 8)
+            candles.append(
+                OHLCV(
+                    symbol=symbol,
+                    candle_date=candle_date,
+                    open_price=100.0 + wave,
+                    high=110.0 + wave,
+                    low=95.0 + wave,
+                    close=105.0 + wave,
+                    volume=1_000_000,
+                )
+            )
+        return candles
+
+
+class FlakyMarketDataProvider(MarketDataProvider):
     """
+    Test provider that injects latency and failures in front of another provider.
+
+    The first `fail_first` calls always fail; later calls fail with
+    probability `failure_rate`. Failures raise `ConnectionError`, like a
+    throttled or dropped HTTP request would.
+    """
+
+    def __init__(
+        self,
+        provider: MarketDataProvider | None = None,
+        latency: float = 0.0,
+        failure_rate: float = 0.0,
+        fail_first: int = 0,
+        seed: int | None = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.provider = provider or MockMarketDataProvider()
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.fail_first = fail_first
+        self.calls = 0
+        self._rng = random.Random(seed)
+        self._sleep = sleep
+        self._lock = threading.Lock()
 
     def get_daily_ohlcv(
         self,
@@ -16,14 +79,14 @@ class MockMarketDataProvider(MarketDataProvider):
         start: date,
         end: date,
     ) -> List[OHLCV]:
-        return [
-            OHLCV(
-                symbol=symbol,
-                candle_date=start,
-                open_price=100.0,
-                high=110.0,
-                low=95.0,
-                close=105.0,
-                volume=1_000_000,
+        with self._lock:
+            self.calls += 1
+            fail = (
+                self.calls <= self.fail_first or self._rng.random() < self.failure_rate
             )
-        ]
+
+        if self.latency:
+            self._sleep(self.latency)
+        if fail:
+            raise ConnectionError(f"injected failure for {symbol}")
+        return self.provider.get_daily_ohlcv(symbol, start, end)
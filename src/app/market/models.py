@@ -1,4 +1,5 @@
 from datetime import date
+from enum import Enum
 from pydantic import BaseModel, Field
 
 
@@ -10,3 +11,23 @@ class OHLCV(BaseModel):
     low: float = Field(description="The lowest price during the period.")
     close: float = Field(description="The closing price of the period.")
     volume: int = Field(description="The trading volume during the period.")
+
+
+class CorporateActionType(str, Enum):
+    SPLIT = "SPLIT"
+    DIVIDEND = "DIVIDEND"
+
+
+class CorporateAction(BaseModel):
+    symbol: str = Field(description="The stock symbol the action applies to.")
+    ex_date: date = Field(description="The ex-date of the corporate action.")
+    action_type: CorporateActionType = Field(
+        description="The kind of corporate action (split or cash dividend)."
+    )
+    value: float = Field(
+        gt=0,
+        description=(
+            "Split ratio (new shares per old share, e.g. 2.0 for a 2-for-1) "
+            "or cash dividend per share."
+        ),
+    )
@@ -0,0 +1,23 @@
+"""Construction of the configured market data provider."""
+
+from app.market.base import MarketDataProvider
+from app.market.mock import MockMarketDataProvider
+
+
+def build_provider(name: str) -> MarketDataProvider:
+    """Create a market data provider by name (`yahoo` or `mock`).
+
+    Yahoo is wrapped in `ResilientMarketDataProvider` and imported lazily
+    so processes using the mock provider never load yfinance.
+
+    Raises:
+        ValueError: if `name` is not a known provider.
+    """
+    if name == "mock":
+        return MockMarketDataProvider()
+    if name == "yahoo":
+        from app.market.resilient import ResilientMarketDataProvider
+        from app.market.yahoo import YahooMarketDataProvider
+
+        return ResilientMarketDataProvider(YahooMarketDataProvider())
+    raise ValueError(f"unknown market provider {name!r}")
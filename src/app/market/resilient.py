@@ -0,0 +1,384 @@
+"""Rate limiting, retry and backoff middleware for market data providers.
+
+`ResilientMarketDataProvider` wraps any `MarketDataProvider` and adds the
+pieces `YahooMarketDataProvider` deliberately leaves to callers:
+
+- a token bucket capping the sustained request rate,
+- jittered exponential backoff between retries,
+- a circuit breaker that stops calling a provider that keeps failing,
+- an AIMD concurrency limit for `fetch_many` that halves on errors and
+  grows again while calls succeed,
+- per-provider throughput and error metrics (`ProviderMetrics`).
+
+Notes:
+- `ValueError` means the request itself is invalid and is never retried.
+- Clock, sleep and random source are injectable so tests run instantly.
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import Callable, Dict, List, Tuple, TypeVar
+
+from pydantic import BaseModel, Field
+
+from app.logging import get_logger
+from app.market.base import MarketDataProvider
+from app.market.models import OHLCV, CorporateAction
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when a call is rejected because the circuit breaker is open."""
+
+
+class TokenBucket:
+    """Thread-safe token bucket allowing `rate` calls per second on average.
+
+    Callers that find the bucket empty reserve the next token and sleep
+    until it is due, so waiting threads are served in arrival order.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        if rate <= 0 or capacity <= 0:
+            raise ValueError("rate and capacity must be positive")
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take one token, sleeping if necessary. Returns the time waited."""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+        if wait > 0:
+            self._sleep(wait)
+        return wait
+
+
+def backoff_delay(
+    attempt: int,
+    base: float,
+    cap: float,
+    rng: random.Random,
+) -> float:
+    """Full-jitter exponential backoff: uniform in `[0, min(cap, base * 2**attempt)]`."""
+    return rng.uniform(0, min(cap, base * (2**attempt)))
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker.
+
+    After `failure_threshold` consecutive failures the breaker opens and
+    rejects calls for `reset_timeout` seconds, then lets a single trial
+    call through (half-open). A success closes it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self.state = self.CLOSED
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN:
+                if self._clock() - self._opened_at < self.reset_timeout:
+                    return False
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._trial_in_flight = False
+            self.state = self.CLOSED
+
+    def release(self) -> None:
+        """Free the half-open trial slot without recording an outcome.
+
+        Used when a call ends for a reason that says nothing about the
+        provider's health, such as an invalid request.
+        """
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = self._clock()
+
+
+class AdaptiveConcurrency:
+    """AIMD concurrency limit.
+
+    The limit grows by one after `limit` consecutive successes and is
+    halved on every failure, staying within `[minimum, maximum]`.
+    """
+
+    def __init__(self, minimum: int = 1, maximum: int = 8, initial: int | None = None):
+        if minimum < 1 or maximum < minimum:
+            raise ValueError("require 1 <= minimum <= maximum")
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = initial if initial is not None else minimum
+        self._in_flight = 0
+        self._successes = 0
+        self._cond = threading.Condition()
+
+    def __enter__(self) -> "AdaptiveConcurrency":
+        with self._cond:
+            while self._in_flight >= self.limit:
+                self._cond.wait()
+            self._in_flight += 1
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    def record_success(self) -> None:
+        with self._cond:
+            self._successes += 1
+            if self._successes >= self.limit and self.limit < self.maximum:
+                self.limit += 1
+                self._successes = 0
+                self._cond.notify_all()
+
+    def record_failure(self) -> None:
+        with self._cond:
+            self._successes = 0
+            self.limit = max(self.minimum, self.limit // 2)
+
+
+class ProviderMetrics(BaseModel):
+    """Snapshot of request statistics for one wrapped provider."""
+
+    provider: str = Field(description="Name of the wrapped provider.")
+    requests: int = Field(description="Provider calls attempted.")
+    successes: int = Field(description="Provider calls that returned data.")
+    failures: int = Field(description="Provider calls that raised an error.")
+    retries: int = Field(description="Calls retried after a failure.")
+    rejected: int = Field(description="Calls rejected by the open circuit breaker.")
+    rows: int = Field(description="Total rows (candles or actions) returned.")
+    elapsed_seconds: float = Field(description="Time since the first request.")
+    throughput: float = Field(description="Successful calls per second.")
+    error_rate: float = Field(description="Failures as a fraction of requests.")
+    concurrency_limit: int = Field(description="Current adaptive concurrency limit.")
+    circuit_state: str = Field(description="Current circuit breaker state.")
+
+
+class ResilientMarketDataProvider(MarketDataProvider):
+    """Provider middleware adding rate limiting, retries and a circuit breaker.
+
+    Example:
+        provider = ResilientMarketDataProvider(YahooMarketDataProvider(), rate=2.0)
+        candles, errors = provider.fetch_many(["AAPL", "MSFT"], start, end)
+    """
+
+    def __init__(
+        self,
+        provider: MarketDataProvider,
+        name: str | None = None,
+        rate: float = 5.0,
+        burst: float = 5.0,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_cap: float = 30.0,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        min_concurrency: int = 1,
+        max_concurrency: int = 8,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+        seed: int | None = None,
+    ):
+        self.provider = provider
+        self.name = name or type(provider).__name__
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.bucket = TokenBucket(rate, burst, clock=clock, sleep=sleep)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout, clock=clock)
+        self.concurrency = AdaptiveConcurrency(
+            min_concurrency, max_concurrency, initial=min_concurrency
+        )
+        self._clock = clock
+        self._sleep = sleep
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._started_at: float | None = None
+        self._counts = dict.fromkeys(
+            ("requests", "successes", "failures", "retries", "rejected", "rows"), 0
+        )
+
+    def get_daily_ohlcv(self, symbol: str, start: date, end: date) -> List[OHLCV]:
+        return self._call(self.provider.get_daily_ohlcv, symbol, start, end)
+
+    def get_corporate_actions(
+        self, symbol: str, start: date, end: date
+    ) -> List[CorporateAction]:
+        return self._call(self.provider.get_corporate_actions, symbol, start, end)
+
+    def get_history(
+        self, symbol: str, start: date, end: date
+    ) -> Tuple[List[OHLCV], List[CorporateAction]]:
+        return self._call(
+            self.provider.get_history,
+            symbol,
+            start,
+            end,
+            rows=lambda history: len(history[0]) + len(history[1]),
+        )
+
+    def fetch_many(
+        self,
+        symbols: List[str],
+        start: date,
+        end: date,
+    ) -> Tuple[Dict[str, List[OHLCV]], Dict[str, Exception]]:
+        """Fetch candles for many symbols concurrently.
+
+        Concurrency is bounded by the adaptive limit; a symbol that still
+        fails after retries is reported in the error dict instead of
+        failing the whole batch.
+
+        Returns:
+            A `(candles_by_symbol, errors_by_symbol)` tuple.
+        """
+        results: Dict[str, List[OHLCV]] = {}
+        errors: Dict[str, Exception] = {}
+
+        with ThreadPoolExecutor(max_workers=self.concurrency.maximum) as pool:
+            futures = {
+                symbol: pool.submit(self.get_daily_ohlcv, symbol, start, end)
+                for symbol in symbols
+            }
+            for symbol, future in futures.items():
+                try:
+                    results[symbol] = future.result()
+                except Exception as exc:
+                    logger.warning(
+                        "Fetch failed after retries",
+                        extra={"provider": self.name, "symbol": symbol},
+                    )
+                    errors[symbol] = exc
+
+        return results, errors
+
+    def metrics(self) -> ProviderMetrics:
+        with self._lock:
+            counts = dict(self._counts)
+            started_at = self._started_at
+        elapsed = self._clock() - started_at if started_at is not None else 0.0
+
+        return ProviderMetrics(
+            provider=self.name,
+            elapsed_seconds=elapsed,
+            throughput=counts["successes"] / elapsed if elapsed > 0 else 0.0,
+            error_rate=(
+                counts["failures"] / counts["requests"] if counts["requests"] else 0.0
+            ),
+            concurrency_limit=self.concurrency.limit,
+            circuit_state=self.breaker.state,
+            **counts,
+        )
+
+    def _count(self, key: str, amount: int = 1) -> None:
+        with self._lock:
+            if self._started_at is None:
+                self._started_at = self._clock()
+            self._counts[key] += amount
+
+    def _call(
+        self,
+        fn: Callable[..., T],
+        *args,
+        rows: Callable[[T], int] = len,
+    ) -> T:
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                self._count("rejected")
+                raise CircuitOpenError(f"circuit open for provider {self.name}")
+
+            self.bucket.acquire()
+            try:
+                with self.concurrency:
+                    self._count("requests")
+                    result = fn(*args)
+            except ValueError:
+                self.breaker.release()
+                raise
+            except Exception as exc:
+                self._count("failures")
+                self.breaker.record_failure()
+                self.concurrency.record_failure()
+                if attempt >= self.max_retries:
+                    raise
+                delay = backoff_delay(
+                    attempt, self.backoff_base, self.backoff_cap, self._rng
+                )
+                logger.debug(
+                    "Retrying provider call",
+                    extra={
+                        "provider": self.name,
+                        "attempt": attempt + 1,
+                        "delay": delay,
+                        "error": repr(exc),
+                    },
+                )
+                self._count("retries")
+                self._sleep(delay)
+                attempt += 1
+                continue
+
+            self.breaker.record_success()
+            self.concurrency.record_success()
+            self._count("successes")
+            self._count("rows", rows(result))
+            return result
@@ -0,0 +1,41 @@
+"""Chunked iteration over provider history.
+
+`iter_daily_ohlcv` walks a long date range in fixed-size windows so the
+caller only ever holds one chunk of candles at a time. It is the input
+side of `BacktestEngine.run_stream`.
+"""
+
+from datetime import date, timedelta
+from typing import Iterator
+
+from app.market.base import MarketDataProvider
+from app.market.models import OHLCV
+
+
+def iter_daily_ohlcv(
+    provider: MarketDataProvider,
+    symbol: str,
+    start: date,
+    end: date,
+    chunk_days: int = 365,
+) -> Iterator[OHLCV]:
+    """Yield daily candles for `symbol` in `[start, end)`, one chunk at a time.
+
+    Args:
+        provider: The provider to pull history from.
+        symbol: Ticker symbol to fetch.
+        start: Inclusive start date.
+        end: Exclusive end date.
+        chunk_days: Calendar days requested per provider call.
+
+    Raises:
+        ValueError: if `chunk_days` is not positive.
+    """
+    if chunk_days <= 0:
+        raise ValueError("chunk_days must be positive")
+
+    chunk_start = start
+    while chunk_start < end:
+        chunk_end = min(chunk_start + timedelta(days=chunk_days), end)
+        yield from provider.get_daily_ohlcv(symbol, chunk_start, chunk_end)
+        chunk_start = chunk_end
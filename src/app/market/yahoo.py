@@ -10,17 +10,22 @@ Notes:
   `volume` respectively.
 - The DataFrame index is converted to a date object and stored as
   `candle_date` on the model.
-- Prices are not auto-adjusted (`auto_adjust=False`) so callers who
-  expect split/dividend-adjusted prices should handle that.
+- Prices are not auto-adjusted (`auto_adjust=False`), but Yahoo's
+  `Close` and `Volume` (and the `Dividends` column) are already
+  split-adjusted; only dividends are left out. The provider therefore
+  reports cash dividends only and never emits `SPLIT` actions, so that
+  `app.market.cache.CandleCache` (which loads candles and actions from
+  one download via `get_history`) does not apply splits a second time.
 """
 
 from datetime import date
-from typing import List
+from typing import List, Tuple
 
+import pandas as pd
 import yfinance as yf
 
 from app.market.base import MarketDataProvider
-from app.market.models import OHLCV
+from app.market.models import OHLCV, CorporateAction, CorporateActionType
 from app.logging import get_logger
 
 logger = get_logger(__name__)
@@ -66,6 +71,40 @@ class YahooMarketDataProvider(MarketDataProvider):
             candles = provider.get_daily_ohlcv("AAPL", date(2024,1,1), date(2024,1,31))
         """
 
+        return self._candles(symbol, self._history(symbol, start, end))
+
+    def get_corporate_actions(
+        self,
+        symbol: str,
+        start: date,
+        end: date,
+    ) -> List[CorporateAction]:
+        """Fetch cash dividends for `symbol` between `start` and `end`.
+
+        Uses the `Dividends` column that `yfinance.Ticker.history()` returns
+        alongside prices; rows without a dividend are skipped. Splits are
+        not reported because the candles are already split-adjusted.
+
+        Raises:
+            ValueError: if `symbol` is empty or `start` > `end`.
+        """
+        return self._actions(symbol, self._history(symbol, start, end))
+
+    def get_history(
+        self,
+        symbol: str,
+        start: date,
+        end: date,
+    ) -> Tuple[List[OHLCV], List[CorporateAction]]:
+        """Fetch candles and corporate actions from a single `history()` call.
+
+        Raises:
+            ValueError: if `symbol` is empty or `start` > `end`.
+        """
+        df = self._history(symbol, start, end)
+        return self._candles(symbol, df), self._actions(symbol, df)
+
+    def _history(self, symbol: str, start: date, end: date) -> pd.DataFrame | None:
         if not symbol:
             raise ValueError("symbol must be provided")
         if start > end:
@@ -83,9 +122,11 @@ class YahooMarketDataProvider(MarketDataProvider):
 
         # Create yfinance Ticker and request historical daily data. We keep
         # `auto_adjust=False` so callers get raw prices; adjust externally if needed.
+        # `actions=True` adds the Dividends column to the same frame.
         ticker = yf.Ticker(symbol)
-        df = ticker.history(start=start, end=end, auto_adjust=False)
+        return ticker.history(start=start, end=end, auto_adjust=False, actions=True)
 
+    def _candles(self, symbol: str, df: pd.DataFrame | None) -> List[OHLCV]:
         # Handle empty results gracefully.
         if df is None or df.empty:
             logger.debug("No data returned from yfinance", extra={"symbol": symbol})
@@ -112,3 +153,26 @@ class YahooMarketDataProvider(MarketDataProvider):
             "Fetched market data rows", extra={"symbol": symbol, "rows": len(candles)}
         )
         return candles
+
+    def _actions(self, symbol: str, df: pd.DataFrame | None) -> List[CorporateAction]:
+        if df is None or df.empty:
+            return []
+
+        actions: List[CorporateAction] = []
+        for index, row in df.iterrows():
+            dividend = float(row.get("Dividends", 0.0) or 0.0)
+            if dividend > 0:
+                actions.append(
+                    CorporateAction(
+                        symbol=symbol,
+                        ex_date=index.date(),
+                        action_type=CorporateActionType.DIVIDEND,
+                        value=dividend,
+                    )
+                )
+
+        logger.info(
+            "Fetched corporate actions",
+            extra={"symbol": symbol, "actions": len(actions)},
+        )
+        return actions
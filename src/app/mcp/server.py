@@ -0,0 +1,425 @@
+"""MCP tool server for market data, signals and backtests.
+
+Speaks the Model Context Protocol's JSON-RPC 2.0 framing over stdio
+(one JSON message per line) and exposes four tools: `get_candles`,
+`scan_signals`, `run_backtest` and `run_sweep`.
+
+The server is meant to run as one long-lived process so that state stays
+warm across tool calls:
+
+- candles live in a shared `CandleCache` (raw and adjusted views),
+- backtest results, including every sweep combination, are memoized in
+  a `BacktestCache`,
+- sweeps fan out over a process pool created once and reused.
+
+Tool calls run concurrently on a thread pool. A client may cancel an
+in-flight call with `notifications/cancelled`; the call stops at its next
+checkpoint and, as the protocol allows, no response is sent for it.
+"""
+
+import json
+import multiprocessing
+import sys
+import threading
+from concurrent.futures import CancelledError, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Callable, Dict, List, TextIO
+
+from app.backtest.cache import BacktestCache
+from app.backtest.engine import BacktestEngine
+from app.backtest.sweep import run_sweep
+from app.config import get_settings
+from app.logging import configure_logging, get_logger
+from app.market.base import MarketDataProvider
+from app.market.cache import CandleCache
+from app.market.registry import build_provider
+from app.signals.swing_sma_rsi import SwingSMARsiStrategy
+
+logger = get_logger(__name__)
+
+PROTOCOL_VERSION = "2025-06-18"
+SERVER_INFO = {"name": "stockmcp", "version": "0.1.0"}
+
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+
+_DATE = {"type": "string", "format": "date", "description": "ISO date (YYYY-MM-DD)."}
+_WINDOWS = {
+    "short_window": {"type": "integer", "default": 20},
+    "long_window": {"type": "integer", "default": 50},
+    "rsi_window": {"type": "integer", "default": 14},
+}
+
+
+@dataclass
+class Tool:
+    name: str
+    description: str
+    input_schema: Dict[str, Any]
+    handler: Callable[[Dict[str, Any], threading.Event], Any]
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "description": self.description,
+            "inputSchema": self.input_schema,
+        }
+
+
+def _schema(properties: Dict[str, Any], required: List[str]) -> Dict[str, Any]:
+    return {"type": "object", "properties": properties, "required": required}
+
+
+def _strategy(args: Dict[str, Any]) -> SwingSMARsiStrategy:
+    return SwingSMARsiStrategy(
+        short_window=int(args.get("short_window", 20)),
+        long_window=int(args.get("long_window", 50)),
+        rsi_window=int(args.get("rsi_window", 14)),
+    )
+
+
+def _check(cancel: threading.Event) -> None:
+    if cancel.is_set():
+        raise CancelledError()
+
+
+class StockMCPServer:
+    """Long-lived MCP server holding warm caches and worker pools.
+
+    Example:
+        server = StockMCPServer(MockMarketDataProvider())
+        server.serve(sys.stdin)
+    """
+
+    def __init__(
+        self,
+        provider: MarketDataProvider,
+        worker_processes: int = 1,
+        call_workers: int = 8,
+        output: TextIO = sys.stdout,
+    ):
+        self.candles = CandleCache(provider)
+        self.results = BacktestCache()
+        self.worker_processes = worker_processes
+        self._output = output
+        self._write_lock = threading.Lock()
+        self._calls = ThreadPoolExecutor(
+            max_workers=call_workers, thread_name_prefix="mcp-call"
+        )
+        self._workers: ProcessPoolExecutor | None = None
+        self._workers_lock = threading.Lock()
+        self._in_flight: Dict[Any, threading.Event] = {}
+        self._in_flight_lock = threading.Lock()
+        self.tools = {
+            tool.name: tool
+            for tool in (
+                Tool(
+                    "get_candles",
+                    "Daily OHLCV candles for a symbol, raw or split/dividend adjusted.",
+                    _schema(
+                        {
+                            "symbol": {"type": "string"},
+                            "start": _DATE,
+                            "end": _DATE,
+                            "adjusted": {"type": "boolean", "default": False},
+                        },
+                        ["symbol", "start", "end"],
+                    ),
+                    self._get_candles,
+                ),
+                Tool(
+                    "scan_signals",
+                    "Latest SMA/RSI swing signal for each symbol.",
+                    _schema(
+                        {
+                            "symbols": {"type": "array", "items": {"type": "string"}},
+                            "start": _DATE,
+                            "end": _DATE,
+                            **_WINDOWS,
+                        },
+                        ["symbols", "start", "end"],
+                    ),
+                    self._scan_signals,
+                ),
+                Tool(
+                    "run_backtest",
+                    "Backtest the SMA/RSI swing strategy on one symbol.",
+                    _schema(
+                        {
+                            "symbol": {"type": "string"},
+                            "start": _DATE,
+                            "end": _DATE,
+                            "initial_cash": {"type": "number", "default": 100_000},
+                            "adjusted": {"type": "boolean", "default": False},
+                            **_WINDOWS,
+                        },
+                        ["symbol", "start", "end"],
+                    ),
+                    self._run_backtest,
+                ),
+                Tool(
+                    "run_sweep",
+                    "Backtest every combination of strategy windows and rank by PnL.",
+                    _schema(
+                        {
+                            "symbol": {"type": "string"},
+                            "start": _DATE,
+                            "end": _DATE,
+                            "short_windows": {
+                                "type": "array",
+                                "items": {"type": "integer"},
+                            },
+                            "long_windows": {
+                                "type": "array",
+                                "items": {"type": "integer"},
+                            },
+                            "rsi_windows": {
+                                "type": "array",
+                                "items": {"type": "integer"},
+                                "default": [14],
+                            },
+                            "initial_cash": {"type": "number", "default": 100_000},
+                            "top": {"type": "integer", "default": 10},
+                        },
+                        ["symbol", "start", "end", "short_windows", "long_windows"],
+                    ),
+                    self._run_sweep,
+                ),
+            )
+        }
+
+    # -- transport -------------------------------------------------------
+
+    def serve(self, stream: TextIO) -> None:
+        """Read messages from `stream` until EOF, then drain in-flight calls."""
+        try:
+            for line in stream:
+                if line.strip():
+                    self.handle_line(line)
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        self._calls.shutdown(wait=True)
+        if self._workers is not None:
+            self._workers.shutdown(wait=True, cancel_futures=True)
+
+    def handle_line(self, line: str) -> None:
+        try:
+            message = json.loads(line)
+        except json.JSONDecodeError as exc:
+            self._error(None, PARSE_ERROR, f"invalid JSON: {exc}")
+            return
+
+        if not isinstance(message, dict) or message.get("jsonrpc") != "2.0":
+            self._error(
+                message.get("id") if isinstance(message, dict) else None,
+                INVALID_REQUEST,
+                "expected a JSON-RPC 2.0 object",
+            )
+            return
+
+        method = message.get("method")
+        params = message.get("params")
+        if params is None:
+            params = {}
+        if "id" not in message:
+            if isinstance(params, dict):
+                self._notification(method, params)
+            return
+
+        request_id = message["id"]
+        if not isinstance(request_id, (str, int, float, type(None))):
+            self._error(None, INVALID_REQUEST, "id must be a string or number")
+            return
+        if not isinstance(params, dict):
+            self._error(request_id, INVALID_PARAMS, "params must be an object")
+            return
+        if method == "initialize":
+            self._reply(
+                request_id,
+                {
+                    "protocolVersion": params.get("protocolVersion", PROTOCOL_VERSION),
+                    "capabilities": {"tools": {"listChanged": False}},
+                    "serverInfo": SERVER_INFO,
+                },
+            )
+        elif method == "ping":
+            self._reply(request_id, {})
+        elif method == "tools/list":
+            self._reply(
+                request_id, {"tools": [t.describe() for t in self.tools.values()]}
+            )
+        elif method == "tools/call":
+            self._start_call(request_id, params)
+        else:
+            self._error(request_id, METHOD_NOT_FOUND, f"unknown method {method!r}")
+
+    def _notification(self, method: str | None, params: Dict[str, Any]) -> None:
+        request_id = params.get("requestId")
+        if method == "notifications/cancelled" and isinstance(request_id, (str, int)):
+            with self._in_flight_lock:
+                cancel = self._in_flight.get(request_id)
+            if cancel is not None:
+                logger.info("Cancelling tool call", extra={"id": request_id})
+                cancel.set()
+
+    def _start_call(self, request_id: Any, params: Dict[str, Any]) -> None:
+        name = params.get("name")
+        tool = self.tools.get(name) if isinstance(name, str) else None
+        if tool is None:
+            self._error(request_id, INVALID_PARAMS, f"unknown tool {name!r}")
+            return
+        arguments = params.get("arguments")
+        if arguments is None:
+            arguments = {}
+        if not isinstance(arguments, dict):
+            self._error(request_id, INVALID_PARAMS, "arguments must be an object")
+            return
+
+        cancel = threading.Event()
+        with self._in_flight_lock:
+            self._in_flight[request_id] = cancel
+        self._calls.submit(self._call, request_id, tool, arguments, cancel)
+
+    def _call(
+        self,
+        request_id: Any,
+        tool: Tool,
+        arguments: Dict[str, Any],
+        cancel: threading.Event,
+    ) -> None:
+        try:
+            payload = tool.handler(arguments, cancel)
+            _check(cancel)
+            result = {
+                "content": [{"type": "text", "text": json.dumps(payload)}],
+                "structuredContent": {"result": payload},
+                "isError": False,
+            }
+        except CancelledError:
+            logger.info("Tool call cancelled", extra={"tool": tool.name})
+            return
+        except (KeyError, TypeError, ValueError) as exc:
+            result = {
+                "content": [{"type": "text", "text": f"{type(exc).__name__}: {exc}"}],
+                "isError": True,
+            }
+        except Exception as exc:
+            logger.exception("Tool call failed", extra={"tool": tool.name})
+            result = {
+                "content": [{"type": "text", "text": f"{type(exc).__name__}: {exc}"}],
+                "isError": True,
+            }
+        finally:
+            with self._in_flight_lock:
+                self._in_flight.pop(request_id, None)
+
+        self._reply(request_id, result)
+
+    def _reply(self, request_id: Any, result: Dict[str, Any]) -> None:
+        self._write({"jsonrpc": "2.0", "id": request_id, "result": result})
+
+    def _error(self, request_id: Any, code: int, message: str) -> None:
+        self._write(
+            {
+                "jsonrpc": "2.0",
+                "id": request_id,
+                "error": {"code": code, "message": message},
+            }
+        )
+
+    def _write(self, message: Dict[str, Any]) -> None:
+        with self._write_lock:
+            self._output.write(json.dumps(message) + "\n")
+            self._output.flush()
+
+    def _worker_pool(self) -> ProcessPoolExecutor | None:
+        if self.worker_processes <= 1:
+            return None
+        with self._workers_lock:
+            if self._workers is None:
+                self._workers = ProcessPoolExecutor(
+                    max_workers=self.worker_processes,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._workers
+
+    # -- tools -----------------------------------------------------------
+
+    def _candles(self, symbol: str, args: Dict[str, Any]):
+        return self.candles.get_daily_ohlcv(
+            symbol,
+            date.fromisoformat(args["start"]),
+            date.fromisoformat(args["end"]),
+            adjusted=bool(args.get("adjusted", False)),
+        )
+
+    def _get_candles(self, args: Dict[str, Any], cancel: threading.Event) -> Any:
+        return [c.model_dump(mode="json") for c in self._candles(args["symbol"], args)]
+
+    def _scan_signals(self, args: Dict[str, Any], cancel: threading.Event) -> Any:
+        strategy = _strategy(args)
+        signals = []
+        for symbol in args["symbols"]:
+            _check(cancel)
+            data = self._candles(symbol, args)
+            if strategy.lookback:
+                data = data[-strategy.lookback :]
+            try:
+                signal = strategy.generate_signal(data)
+            except (ValueError, IndexError):
+                signals.append(
+                    {"symbol": symbol, "signal": None, "reason": "Not enough data"}
+                )
+                continue
+            signals.append(signal.model_dump(mode="json"))
+        return signals
+
+    def _run_backtest(self, args: Dict[str, Any], cancel: threading.Event) -> Any:
+        strategy = _strategy(args)
+        data = self._candles(args["symbol"], args)
+        _check(cancel)
+        result = self.results.run(
+            BacktestEngine(),
+            data,
+            strategy,
+            initial_cash=float(args.get("initial_cash", 100_000)),
+        )
+        return result.model_dump(mode="json")
+
+    def _run_sweep(self, args: Dict[str, Any], cancel: threading.Event) -> Any:
+        data = self._candles(args["symbol"], args)
+        grid = {
+            "short_window": [int(v) for v in args["short_windows"]],
+            "long_window": [int(v) for v in args["long_windows"]],
+            "rsi_window": [int(v) for v in args.get("rsi_windows", [14])],
+        }
+        ranked = run_sweep(
+            data,
+            grid,
+            initial_cash=float(args.get("initial_cash", 100_000)),
+            executor=self._worker_pool(),
+            cancel=cancel,
+            cache=self.results,
+        )
+        return [r.model_dump(mode="json") for r in ranked[: int(args.get("top", 10))]]
+
+
+def main() -> None:
+    """Run the MCP server over stdin/stdout until stdin closes."""
+    configure_logging()
+    settings = get_settings()
+    server = StockMCPServer(
+        build_provider(settings.market_provider),
+        worker_processes=settings.worker_processes,
+    )
+    logger.info("MCP server started", extra={"provider": settings.market_provider})
+    server.serve(sys.stdin)
+
+
+if __name__ == "__main__":
+    main()
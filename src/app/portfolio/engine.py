@@ -1,14 +1,23 @@
+from typing import List, Sequence
+
+import numpy as np
+
 from app.portfolio.models import Portfolio, Position
-from app.portfolio.sizing import fixed_fractional_sizing
+from app.portfolio.risk import RiskManager
+from app.portfolio.sizing import batch_sizing, fixed_fractional_sizing
 from app.signals.enums import SignalType
 
 """
 PortfolioEngine is responsible for managing a portfolio of positions based on trading signals.
 It applies buy and sell signals to update the portfolio's positions and cash balance accordingly.
+An optional RiskManager vets entries and can force exits once its limits are breached.
 """
 
 
 class PortfolioEngine:
+    def __init__(self, risk: RiskManager | None = None):
+        self.risk = risk
+
     def apply_signal(
         self,
         portfolio: Portfolio,
@@ -29,19 +38,161 @@ class PortfolioEngine:
         Returns:
             Portfolio: The updated state of the portfolio after applying the signal.
         """
+        risk = self.risk
+        if risk is not None and risk.should_liquidate:
+            signal = SignalType.SELL
+
+        # Only `symbol` has a fresh price; other positions keep their last mark.
+        market_value = self._revalue(portfolio, {symbol: price})
+        portfolio.equity = portfolio.cash + market_value
+
         if signal == SignalType.BUY and symbol not in portfolio.positions:
             qty = fixed_fractional_sizing(portfolio.cash, price)
+            if risk is not None:
+                qty = risk.allowed_quantity(symbol, qty, price, portfolio.equity)
             if qty > 0:
                 portfolio.positions[symbol] = Position(
-                    symbol=symbol, quantity=qty, avg_price=price, entry_date=date
+                    symbol=symbol,
+                    quantity=qty,
+                    avg_price=price,
+                    entry_date=date,
+                    last_price=price,
                 )
                 portfolio.cash -= qty * price
+                market_value += qty * price
         elif signal == SignalType.SELL and symbol in portfolio.positions:
             pos = portfolio.positions.pop(symbol)
             portfolio.cash += pos.quantity * price
+            market_value -= pos.quantity * price
+
+        portfolio.equity = portfolio.cash + market_value
+        position = portfolio.positions.get(symbol)
 
-        portfolio.equity = portfolio.cash + sum(
-            p.quantity * price for p in portfolio.positions.values()
-        )
+        if risk is not None:
+            risk.update_exposure(symbol, position.quantity * price if position else 0.0)
+            risk.update_equity(portfolio.equity, date)
 
         return portfolio
+
+    def apply_signals(
+        self,
+        portfolio: Portfolio,
+        symbols: List[str],
+        signals: List[SignalType],
+        prices: Sequence[float],
+        date,
+        strengths: Sequence[float] | None = None,
+        volatilities: Sequence[float] | None = None,
+        max_position_fraction: float = 0.1,
+        max_total_exposure: float = 1.0,
+    ) -> Portfolio:
+        """Applies one bar of signals across many symbols at once.
+
+        Sells are executed first so their proceeds are available, then every
+        BUY candidate is sized together with `batch_sizing`, with symbols
+        breaking ties, so the outcome does not depend on the order of
+        `symbols`.
+
+        Args:
+            portfolio (Portfolio): The current state of the portfolio.
+            symbols (List[str]): Symbols with a signal on this bar.
+            signals (List[SignalType]): Signal per symbol.
+            prices (Sequence[float]): Current price per symbol.
+            date (_type_): The date when the signals are applied.
+            strengths (Sequence[float], optional): Signal strength per symbol. Defaults to equal strength.
+            volatilities (Sequence[float], optional): Volatility per symbol. Defaults to equal volatility.
+            max_position_fraction (float): Cap on one position as a fraction of equity.
+            max_total_exposure (float): Cap on all positions as a fraction of equity.
+
+        Returns:
+            Portfolio: The updated state of the portfolio after applying the signals.
+        """
+        risk = self.risk
+        marks = dict(zip(symbols, prices))
+        market_value = self._revalue(portfolio, marks)
+
+        for symbol, signal in zip(symbols, signals):
+            liquidate = risk is not None and risk.should_liquidate
+            if (
+                signal == SignalType.SELL or liquidate
+            ) and symbol in portfolio.positions:
+                pos = portfolio.positions.pop(symbol)
+                portfolio.cash += pos.quantity * marks[symbol]
+                market_value -= pos.quantity * marks[symbol]
+
+        portfolio.equity = portfolio.cash + market_value
+
+        buys = [
+            i
+            for i, (symbol, signal) in enumerate(zip(symbols, signals))
+            if signal == SignalType.BUY and symbol not in portfolio.positions
+        ]
+        if buys and not (risk is not None and risk.blocked):
+            buy_prices = np.asarray(prices, dtype=np.float64)[buys]
+            quantities = batch_sizing(
+                cash=portfolio.cash,
+                prices=buy_prices,
+                strengths=(
+                    np.ones(len(buys))
+                    if strengths is None
+                    else np.asarray(strengths, dtype=np.float64)[buys]
+                ),
+                volatilities=(
+                    np.ones(len(buys))
+                    if volatilities is None
+                    else np.asarray(volatilities, dtype=np.float64)[buys]
+                ),
+                equity=portfolio.equity,
+                max_position_fraction=max_position_fraction,
+                max_total_exposure=max_total_exposure,
+                current_exposure=market_value,
+                keys=[symbols[i] for i in buys],
+            )
+            for i, qty, price in zip(buys, quantities.tolist(), buy_prices.tolist()):
+                symbol = symbols[i]
+                if risk is not None:
+                    qty = risk.allowed_quantity(symbol, qty, price, portfolio.equity)
+                if qty > 0:
+                    portfolio.positions[symbol] = Position(
+                        symbol=symbol,
+                        quantity=qty,
+                        avg_price=price,
+                        entry_date=date,
+                        last_price=price,
+                    )
+                    portfolio.cash -= qty * price
+                    market_value += qty * price
+
+        portfolio.equity = portfolio.cash + market_value
+
+        if risk is not None:
+            for symbol in symbols:
+                position = portfolio.positions.get(symbol)
+                risk.update_exposure(
+                    symbol, position.quantity * marks[symbol] if position else 0.0
+                )
+            risk.update_equity(portfolio.equity, date)
+
+        return portfolio
+
+    @staticmethod
+    def _revalue(portfolio: Portfolio, marks: dict) -> float:
+        """Moves the marked positions to `marks` and returns the new market value.
+
+        The market value of all positions is carried as `equity - cash`
+        and adjusted by each marked symbol's price change, so the cost is
+        proportional to `marks` rather than to the number of positions.
+        """
+        market_value = portfolio.equity - portfolio.cash
+        for symbol, price in marks.items():
+            position = portfolio.positions.get(symbol)
+            if position is None:
+                continue
+            mark = (
+                position.avg_price
+                if position.last_price is None
+                else position.last_price
+            )
+            market_value += position.quantity * (price - mark)
+            position.last_price = price
+        return market_value
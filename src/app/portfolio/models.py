@@ -14,6 +14,10 @@ class Position(BaseModel):
         description="The average price at which the asset was acquired."
     )
     entry_date: date = Field(description="The date when the position was entered.")
+    last_price: float | None = Field(
+        default=None,
+        description="The latest price seen for the asset, used to value the position.",
+    )
 
 
 class Portfolio(BaseModel):
@@ -1,3 +1,9 @@
+from datetime import date
+from typing import Dict
+
+from pydantic import BaseModel, Field
+
+
 def max_drawdown_allowed(
     equity_peak: float,
     current_equity: float,
@@ -19,3 +25,192 @@ def max_drawdown_allowed(
 
     drawdown = (equity_peak - current_equity) / equity_peak
     return drawdown >= max_dd
+
+
+class RiskLimits(BaseModel):
+    """
+    Limits enforced by the `RiskManager` while a portfolio is being traded.
+    """
+
+    max_drawdown: float = Field(
+        default=0.2,
+        description="Drawdown from peak equity (as a decimal) that halts new entries.",
+    )
+    max_daily_loss: float | None = Field(
+        default=None,
+        description="Loss versus the previous day's last equity (as a decimal) that blocks entries for the rest of the day.",
+    )
+    max_position_exposure: float | None = Field(
+        default=None,
+        description="Maximum market value of a single position as a fraction of equity.",
+    )
+    liquidate_on_halt: bool = Field(
+        default=False,
+        description="Close held positions on their next event once trading is halted.",
+    )
+
+
+class RiskState(BaseModel):
+    """
+    Serializable snapshot of a `RiskManager`'s running state.
+    """
+
+    peak_equity: float = Field(description="Highest equity seen so far.")
+    drawdown: float = Field(description="Current drawdown from peak (as a decimal).")
+    current_day: date | None = Field(description="Date of the latest equity mark.")
+    day_start_equity: float = Field(
+        description="Last equity mark before the current day (first mark on day one)."
+    )
+    last_equity: float = Field(default=0.0, description="Latest equity mark.")
+    daily_loss: float = Field(
+        description="Loss versus `day_start_equity` (as a decimal)."
+    )
+    exposures: Dict[str, float] = Field(description="Market value held per symbol.")
+    halted: bool = Field(description="Whether the drawdown limit has halted trading.")
+    halt_reason: str | None = Field(description="Why trading was halted, if it was.")
+    day_blocked: bool = Field(description="Whether entries are blocked for the day.")
+
+
+class RiskManager:
+    """
+    Streaming risk guardrails.
+
+    Keeps running peak equity, drawdown, daily loss and per-symbol exposure,
+    updating each in constant time per event so the same instance can sit in
+    a backtest loop or a live scanner without scanning history.
+    """
+
+    def __init__(self, limits: RiskLimits | None = None):
+        self.limits = limits or RiskLimits()
+        self.peak_equity = 0.0
+        self.drawdown = 0.0
+        self.current_day: date | None = None
+        self.day_start_equity = 0.0
+        self.last_equity = 0.0
+        self.daily_loss = 0.0
+        self.exposures: Dict[str, float] = {}
+        self.halted = False
+        self.halt_reason: str | None = None
+        self._day_blocked = False
+
+    def snapshot(self) -> RiskState:
+        """
+        Capture the running state so it can be checkpointed.
+        """
+        return RiskState(
+            peak_equity=self.peak_equity,
+            drawdown=self.drawdown,
+            current_day=self.current_day,
+            day_start_equity=self.day_start_equity,
+            last_equity=self.last_equity,
+            daily_loss=self.daily_loss,
+            exposures=dict(self.exposures),
+            halted=self.halted,
+            halt_reason=self.halt_reason,
+            day_blocked=self._day_blocked,
+        )
+
+    @classmethod
+    def from_snapshot(cls, limits: RiskLimits, state: RiskState) -> "RiskManager":
+        """
+        Rebuild a manager from `limits` and a `snapshot()`.
+        """
+        manager = cls(limits)
+        manager.peak_equity = state.peak_equity
+        manager.drawdown = state.drawdown
+        manager.current_day = state.current_day
+        manager.day_start_equity = state.day_start_equity
+        manager.last_equity = state.last_equity
+        manager.daily_loss = state.daily_loss
+        manager.exposures = dict(state.exposures)
+        manager.halted = state.halted
+        manager.halt_reason = state.halt_reason
+        manager._day_blocked = state.day_blocked
+        return manager
+
+    @property
+    def blocked(self) -> bool:
+        """True when no new positions may be opened."""
+        return self.halted or self._day_blocked
+
+    def update_equity(self, equity: float, day: date) -> None:
+        """
+        Fold the latest equity mark into the running state.
+
+        Daily loss is measured against the last mark of the previous day,
+        so a loss shows up even when there is only one mark per day.
+
+        Args:
+            equity (float): The current portfolio equity.
+            day (date): The date of the event producing this mark.
+        """
+        if day != self.current_day:
+            self.day_start_equity = (
+                equity if self.current_day is None else self.last_equity
+            )
+            self.current_day = day
+            self._day_blocked = False
+        self.last_equity = equity
+
+        if equity > self.peak_equity:
+            self.peak_equity = equity
+        if self.peak_equity > 0:
+            self.drawdown = (self.peak_equity - equity) / self.peak_equity
+            if not self.halted and max_drawdown_allowed(
+                self.peak_equity, equity, self.limits.max_drawdown
+            ):
+                self.halted = True
+                self.halt_reason = f"max drawdown {self.drawdown:.2%} breached"
+
+        if self.day_start_equity > 0:
+            self.daily_loss = max(
+                (self.day_start_equity - equity) / self.day_start_equity, 0.0
+            )
+            if (
+                self.limits.max_daily_loss is not None
+                and self.daily_loss >= self.limits.max_daily_loss
+            ):
+                self._day_blocked = True
+
+    def update_exposure(self, symbol: str, market_value: float) -> None:
+        """
+        Record the current market value held in `symbol` (0 when flat).
+        """
+        if market_value:
+            self.exposures[symbol] = market_value
+        else:
+            self.exposures.pop(symbol, None)
+
+    def allowed_quantity(
+        self,
+        symbol: str,
+        quantity: int,
+        price: float,
+        equity: float,
+    ) -> int:
+        """
+        Clamp a proposed entry to the active limits.
+
+        Args:
+            symbol (str): The symbol being bought.
+            quantity (int): The proposed number of shares.
+            price (float): The entry price.
+            equity (float): The current portfolio equity.
+
+        Returns:
+            int: The number of shares that may be bought (0 when blocked).
+        """
+        if self.blocked or quantity <= 0 or price <= 0:
+            return 0
+
+        cap = self.limits.max_position_exposure
+        if cap is None:
+            return quantity
+
+        headroom = cap * equity - self.exposures.get(symbol, 0.0)
+        return max(min(quantity, int(headroom // price)), 0)
+
+    @property
+    def should_liquidate(self) -> bool:
+        """True when open positions should be closed on their next event."""
+        return self.halted and self.limits.liquidate_on_halt
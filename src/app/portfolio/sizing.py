@@ -1,3 +1,8 @@
+from typing import Sequence
+
+import numpy as np
+
+
 def fixed_fractional_sizing(
     cash: float,
     price: float,
@@ -17,3 +22,89 @@ def fixed_fractional_sizing(
     allocation = cash * risk_fraction
     quantity = int(allocation // price)
     return max(quantity, 0)
+
+
+def batch_sizing(
+    cash: float,
+    prices: np.ndarray,
+    strengths: np.ndarray,
+    volatilities: np.ndarray,
+    equity: float | None = None,
+    max_position_fraction: float = 0.1,
+    max_total_exposure: float = 1.0,
+    current_exposure: float = 0.0,
+    keys: Sequence[str] | None = None,
+) -> np.ndarray:
+    """
+    Size every BUY candidate of a bar at once against the shared cash budget.
+
+    Candidates are scored by signal strength per unit of volatility. The
+    budget is split in proportion to score, each target is capped at
+    `max_position_fraction` of equity and rounded down to whole shares, and
+    the cash left over by rounding is handed out in score order. The result
+    does not depend on the order candidates are passed in: ties in score
+    are broken by lower price, then by `keys` (e.g. symbols). Candidates with a missing (NaN) or
+    non-positive price, strength or volatility get zero shares.
+
+    Args:
+        cash (float): The cash available for new positions.
+        prices (np.ndarray): Entry price per candidate.
+        strengths (np.ndarray): Non-negative signal strength per candidate.
+        volatilities (np.ndarray): Positive volatility per candidate (e.g. stdev of returns).
+        equity (float, optional): Portfolio equity used for the caps. Defaults to `cash`.
+        max_position_fraction (float): Maximum value of one position as a fraction of equity.
+        max_total_exposure (float): Maximum value of all positions as a fraction of equity.
+        current_exposure (float): Market value already held in open positions.
+        keys (Sequence[str], optional): Unique label per candidate breaking ties in score and price.
+
+    Returns:
+        np.ndarray: Integer share counts aligned with `prices`.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    strengths = np.asarray(strengths, dtype=np.float64)
+    volatilities = np.asarray(volatilities, dtype=np.float64)
+    equity = cash if equity is None else equity
+
+    shares = np.zeros(prices.shape, dtype=np.int64)
+    budget = min(cash, max_total_exposure * equity - current_exposure)
+    if budget <= 0 or prices.size == 0:
+        return shares
+
+    # NaN compares False, so missing quotes or volatilities drop out here.
+    valid = (
+        np.isfinite(prices)
+        & (prices > 0)
+        & np.isfinite(strengths)
+        & (strengths > 0)
+        & np.isfinite(volatilities)
+        & (volatilities > 0)
+    )
+    scores = np.where(valid, strengths / np.where(valid, volatilities, 1.0), 0.0)
+    total_score = scores.sum()
+    if total_score <= 0:
+        return shares
+
+    cap = max_position_fraction * equity
+    safe_prices = np.where(valid, prices, 1.0)
+    targets = np.minimum(scores / total_score * budget, cap)
+    shares = np.where(valid, np.floor(targets / safe_prices), 0).astype(np.int64)
+
+    # Hand the rounding leftover to the best-ranked candidates that still
+    # have room under the cap, stopping at the first one that does not fit.
+    leftover = budget - float(np.dot(shares, np.where(valid, prices, 0.0)))
+    tie_keys = () if keys is None else (np.asarray(keys),)
+    order = np.lexsort((*tie_keys, safe_prices, -scores))
+    room = np.floor((cap - shares * safe_prices) / safe_prices)
+    room = np.where(valid, np.maximum(room, 0), 0)[order]
+    extra_cost = np.cumsum(room * safe_prices[order])
+    fits = extra_cost <= leftover
+    extra = np.where(fits, room, 0)
+
+    first_miss = int(np.argmin(fits)) if not fits.all() else None
+    if first_miss is not None:
+        spent = extra_cost[first_miss - 1] if first_miss > 0 else 0.0
+        partial = np.floor((leftover - spent) / safe_prices[order][first_miss])
+        extra[first_miss] = min(max(partial, 0), room[first_miss])
+
+    shares[order] += extra.astype(np.int64)
+    return shares
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Any, Dict, List
 
 from app.market.models import OHLCV
 from app.signals.models import TradingSignal
@@ -8,8 +8,17 @@ from app.signals.models import TradingSignal
 class SignalStrategy(ABC):
     """
     Base interface for all trading strategies.
+
+    `lookback` is the number of most recent candles `generate_signal`
+    needs. Engines may pass only that many; `None` means the full history.
     """
 
+    lookback: int | None = None
+
+    def params(self) -> Dict[str, Any]:
+        """Public instance attributes, used to identify a configured strategy."""
+        return {k: v for k, v in sorted(vars(self).items()) if not k.startswith("_")}
+
     @abstractmethod
     def generate_signal(self, data: List[OHLCV]) -> TradingSignal:
         raise NotImplementedError
@@ -28,6 +28,10 @@ class SwingSMARsiStrategy(SignalStrategy):
         self.long_window = long_window
         self.rsi_window = rsi_window
 
+    @property
+    def lookback(self) -> int:
+        return max(self.long_window, self.rsi_window + 1)
+
     def generate_signal(self, data: List[OHLCV]) -> TradingSignal:
         closes = [c.close for c in data]
         latest = data[-1]
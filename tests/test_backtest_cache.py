@@ -0,0 +1,126 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from pathlib import Path
+
+from app.backtest.cache import BacktestCache, backtest_cache_key, code_fingerprint
+from app.backtest.engine import BacktestEngine
+from app.backtest.sweep import run_sweep
+from app.market.models import OHLCV
+from app.signals.swing_sma_rsi import SwingSMARsiStrategy
+
+
+def make_data(n: int = 80, offset: float = 0.0):
+    start = date(2024, 1, 1)
+    return [
+        OHLCV(
+            symbol="AAPL",
+            candle_date=start + timedelta(days=i),
+            open_price=100 + i,
+            high=105 + i,
+            low=95 + i,
+            close=102 + i + offset,
+            volume=1000 + i * 10,
+        )
+        for i in range(n)
+    ]
+
+
+class CountingEngine(BacktestEngine):
+    def __init__(self):
+        super().__init__()
+        self.runs = 0
+
+    def run(self, data, strategy, initial_cash=100_000):
+        self.runs += 1
+        return super().run(data=data, strategy=strategy, initial_cash=initial_cash)
+
+
+def test_key_changes_with_inputs():
+    engine = BacktestEngine()
+    data = make_data()
+    base = backtest_cache_key(engine, data, SwingSMARsiStrategy(), 100_000)
+
+    assert base == backtest_cache_key(
+        engine, make_data(), SwingSMARsiStrategy(), 100_000
+    )
+    assert base != backtest_cache_key(
+        engine, make_data(offset=0.5), SwingSMARsiStrategy(), 100_000
+    )
+    assert base != backtest_cache_key(
+        engine, data, SwingSMARsiStrategy(short_window=10), 100_000
+    )
+    assert base != backtest_cache_key(engine, data, SwingSMARsiStrategy(), 50_000)
+
+
+def test_memory_and_disk_tiers_skip_rerun(tmp_path):
+    engine = CountingEngine()
+    data = make_data()
+
+    first = BacktestCache(directory=tmp_path).run(engine, data, SwingSMARsiStrategy())
+    again = BacktestCache(directory=tmp_path).run(engine, data, SwingSMARsiStrategy())
+
+    cache = BacktestCache(directory=tmp_path)
+    cache.run(engine, data, SwingSMARsiStrategy())
+    cache.run(engine, data, SwingSMARsiStrategy())
+
+    assert engine.runs == 1
+    assert again == first
+    assert cache.hits == 2
+
+
+def test_disk_tier_evicts_by_size(tmp_path):
+    engine = BacktestEngine()
+    cache = BacktestCache(directory=tmp_path, max_bytes=1)
+
+    cache.run(engine, make_data(), SwingSMARsiStrategy())
+    cache.run(engine, make_data(offset=1.0), SwingSMARsiStrategy())
+
+    assert len(list(tmp_path.glob("*.json"))) <= 1
+
+
+def test_entry_evicted_during_read_is_still_a_hit(tmp_path, monkeypatch):
+    engine, data, strategy = BacktestEngine(), make_data(), SwingSMARsiStrategy()
+    expected = BacktestCache(directory=tmp_path).run(engine, data, strategy)
+
+    def evicted(path, *args, **kwargs):
+        raise FileNotFoundError(path)
+
+    monkeypatch.setattr("app.backtest.cache.os.utime", evicted)
+    key = backtest_cache_key(engine, data, strategy, 100_000)
+
+    assert BacktestCache(directory=tmp_path).get(key) == expected
+
+
+def test_fingerprint_covers_recorders_and_strategy_bases(monkeypatch):
+    hashed = []
+
+    def digest(path, mtime_ns, size):
+        hashed.append(path)
+        return path
+
+    monkeypatch.setattr("app.backtest.cache._file_digest", digest)
+    code_fingerprint(SwingSMARsiStrategy)
+
+    names = {f"{Path(path).parent.name}/{Path(path).name}" for path in hashed}
+    assert {
+        "backtest/recorders.py",
+        "signals/base.py",
+        "signals/swing_sma_rsi.py",
+    } <= names
+
+
+def test_repeated_sweep_is_served_from_cache():
+    cache = BacktestCache()
+    data = make_data(120)
+    grid = {"short_window": [5, 10], "long_window": [20, 30]}
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        first = run_sweep(data, grid, executor=executor, cache=cache)
+        misses = cache.misses
+        second = run_sweep(data, grid, executor=executor, cache=cache)
+
+    assert misses == 4
+    assert cache.misses == misses
+    assert cache.hits == 4
+    assert second == first
+    assert run_sweep(data, grid, cache=cache) == first
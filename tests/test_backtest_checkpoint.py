@@ -0,0 +1,150 @@
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from app.backtest.checkpoint import load_checkpoint, save_checkpoint
+from app.backtest.engine import BacktestEngine
+from app.backtest.models import Trade
+from app.backtest.recorders import FileRecorder, MemoryRecorder
+from app.market.models import OHLCV
+from app.portfolio.risk import RiskLimits
+from app.signals.swing_sma_rsi import SwingSMARsiStrategy
+
+
+def make_data(n: int = 300, seed: int = 4):
+    rng = random.Random(seed)
+    price = 100.0
+    data = []
+    for i in range(n):
+        price *= 1 + rng.gauss(0, 0.02)
+        data.append(
+            OHLCV(
+                symbol="AAPL",
+                candle_date=date(2023, 1, 1) + timedelta(days=i),
+                open_price=price,
+                high=price,
+                low=price,
+                close=price,
+                volume=1000,
+            )
+        )
+    return data
+
+
+def summary(result):
+    return (
+        result.total_trades,
+        result.total_pnl,
+        result.win_rate,
+        result.max_drawdown,
+        result.halt_reason,
+    )
+
+
+@pytest.mark.parametrize(
+    "risk_limits", [None, RiskLimits(max_drawdown=0.05, liquidate_on_halt=True)]
+)
+def test_daily_resume_matches_full_rerun(tmp_path, risk_limits):
+    data = make_data()
+    strategy = SwingSMARsiStrategy(short_window=5, long_window=20)
+    engine = BacktestEngine(risk_limits=risk_limits)
+    full = engine.run(data, strategy)
+
+    session = engine.session(strategy, recorder=FileRecorder(tmp_path / "out"))
+    session.feed(data[:200])
+    session.close()
+    save_checkpoint(session.checkpoint(), tmp_path / "aapl.ckpt")
+    early_size = (tmp_path / "aapl.ckpt").stat().st_size
+
+    for i in range(200, len(data)):
+        checkpoint = load_checkpoint(tmp_path / "aapl.ckpt")
+        result, checkpoint = engine.resume(
+            checkpoint, data[i : i + 1], strategy, FileRecorder(tmp_path / "out")
+        )
+        save_checkpoint(checkpoint, tmp_path / "aapl.ckpt")
+
+    lines = (tmp_path / "out" / "equity.csv").read_text().splitlines()
+    closed = [
+        Trade.model_validate_json(line)
+        for line in (tmp_path / "out" / "trades.jsonl").read_text().splitlines()
+    ]
+    open_trades = [t for t in result.trades if t.exit_date is None]
+
+    assert full.total_trades > 0
+    assert summary(result) == summary(full)
+    assert [float(line.split(",")[1]) for line in lines] == full.equity_curve
+    assert sorted(closed + open_trades, key=lambda t: t.entry_date) == full.trades
+    assert (tmp_path / "aapl.ckpt").stat().st_size < early_size * 1.2
+
+
+def test_resume_skips_already_processed_candles():
+    data = make_data(120)
+    strategy = SwingSMARsiStrategy(short_window=5, long_window=20)
+    engine = BacktestEngine()
+    full = engine.run(data, strategy)
+
+    session = engine.session(strategy, recorder=MemoryRecorder())
+    session.feed(data[:100])
+    result, _ = engine.resume(session.checkpoint(), data[90:], strategy)
+
+    assert summary(result) == summary(full)
+    assert result.equity_curve == full.equity_curve[100:]
+
+
+class SpyStrategy(SwingSMARsiStrategy):
+    """Records every window the engine passes and the signal it produced."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._calls = []
+
+    def generate_signal(self, data):
+        call = ({c.symbol for c in data}, data[-1].symbol, data[-1].candle_date)
+        try:
+            signal = super().generate_signal(data)
+        except ValueError:
+            self._calls.append((*call, None))
+            raise
+        self._calls.append((*call, signal.signal))
+        return signal
+
+    def signals(self, symbol):
+        return [(day, signal) for _, s, day, signal in self._calls if s == symbol]
+
+
+def test_multi_symbol_signals_use_per_symbol_windows():
+    aapl = make_data(80, seed=1)
+    msft = [c.model_copy(update={"symbol": "MSFT"}) for c in make_data(80, seed=2)]
+    data = [candle for pair in zip(aapl, msft) for candle in pair]
+    engine = BacktestEngine()
+
+    assert len(engine.run(aapl + msft, SpyStrategy()).equity_curve) == 160
+
+    spy = SpyStrategy(short_window=5, long_window=20)
+    full = engine.run(data, spy)
+    for symbol, series in (("AAPL", aapl), ("MSFT", msft)):
+        alone = SpyStrategy(short_window=5, long_window=20)
+        engine.run(series, alone)
+        assert any(signal for _, signal in alone.signals(symbol))
+        assert spy.signals(symbol) == alone.signals(symbol)
+    assert all(symbols == {symbol} for symbols, symbol, _, _ in spy._calls)
+
+    strategy = SwingSMARsiStrategy(short_window=5, long_window=20)
+    session = engine.session(strategy)
+    session.feed(data[:101])
+    checkpoint = session.checkpoint()
+    result, _ = engine.resume(checkpoint, data[90:], strategy)
+
+    assert set(checkpoint.windows) == {"AAPL", "MSFT"}
+    assert summary(result) == summary(full)
+    assert result.equity_curve == full.equity_curve[101:]
+
+
+def test_resume_rejects_different_strategy_parameters():
+    engine = BacktestEngine()
+    session = engine.session(SwingSMARsiStrategy(short_window=5, long_window=20))
+    session.feed(make_data(30))
+
+    with pytest.raises(ValueError):
+        engine.resume(session.checkpoint(), [], SwingSMARsiStrategy())
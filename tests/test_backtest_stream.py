@@ -0,0 +1,97 @@
+import math
+from datetime import date, timedelta
+from typing import List
+
+from app.backtest.engine import BacktestEngine
+from app.backtest.models import Trade
+from app.backtest.recorders import FileRecorder, MemoryRecorder
+from app.market.base import MarketDataProvider
+from app.market.models import OHLCV
+from app.market.stream import iter_daily_ohlcv
+from app.signals.swing_sma_rsi import SwingSMARsiStrategy
+
+
+class WaveProvider(MarketDataProvider):
+    """One candle per calendar day following a slow sine wave."""
+
+    def __init__(self):
+        self.requests = []
+
+    def get_daily_ohlcv(self, symbol: str, start: date, end: date) -> List[OHLCV]:
+        self.requests.append((start, end))
+        origin = date(2020, 1, 1)
+        candles = []
+        day = start
+        while day < end:
+            close = 100 + 20 * math.sin((day - origin).days / 15)
+            candles.append(
+                OHLCV(
+                    symbol=symbol,
+                    candle_date=day,
+                    open_price=close,
+                    high=close,
+                    low=close,
+                    close=close,
+                    volume=1000,
+                )
+            )
+            day += timedelta(days=1)
+        return candles
+
+
+def test_stream_matches_in_memory_run():
+    provider = WaveProvider()
+    start, end = date(2020, 1, 1), date(2021, 1, 1)
+    strategy = SwingSMARsiStrategy(short_window=5, long_window=20)
+    engine = BacktestEngine()
+
+    full = engine.run(WaveProvider().get_daily_ohlcv("AAPL", start, end), strategy)
+    streamed = engine.run_stream(
+        iter_daily_ohlcv(provider, "AAPL", start, end, chunk_days=30),
+        strategy,
+        recorder=MemoryRecorder(),
+    )
+
+    assert len(provider.requests) == 13
+    assert streamed == full
+    assert full.total_trades > 0
+
+
+def test_memory_recorder_downsamples_to_bound():
+    recorder = MemoryRecorder(max_points=10)
+
+    for i in range(1000):
+        recorder.record_equity(date(2020, 1, 1), float(i))
+
+    assert len(recorder.equity_curve) <= 10
+    assert recorder.equity_curve[0] == 0.0
+
+
+def test_memory_recorder_keeps_most_recent_trades():
+    recorder = MemoryRecorder(max_trades=3)
+
+    for day in range(1, 11):
+        recorder.record_trade(
+            Trade(symbol="AAPL", entry_date=date(2020, 1, day), entry_price=1.0)
+        )
+
+    assert [t.entry_date.day for t in recorder.trades] == [8, 9, 10]
+
+
+def test_file_recorder_writes_incrementally(tmp_path):
+    provider = WaveProvider()
+    start, end = date(2020, 1, 1), date(2020, 7, 1)
+
+    result = BacktestEngine().run_stream(
+        iter_daily_ohlcv(provider, "AAPL", start, end, chunk_days=7),
+        SwingSMARsiStrategy(short_window=5, long_window=20),
+        recorder=FileRecorder(tmp_path),
+    )
+
+    lines = (tmp_path / "equity.csv").read_text().splitlines()
+    trades = (tmp_path / "trades.jsonl").read_text().splitlines()
+    assert len(lines) == (end - start).days
+    # Closed trades are on disk; only still-open ones come back in the result.
+    assert all(t.exit_date is None for t in result.trades)
+    assert len(trades) + len(result.trades) == result.total_trades
+    assert result.equity_curve == []
@@ -0,0 +1,173 @@
+import threading
+from datetime import date, timedelta
+from typing import List
+
+import pytest
+
+from app.market.base import MarketDataProvider
+from app.market.cache import CandleCache
+from app.market.models import OHLCV, CorporateAction, CorporateActionType
+
+
+class CountingProvider(MarketDataProvider):
+    """Provider with one candle per day and a 2-for-1 split on day 5."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def get_daily_ohlcv(self, symbol: str, start: date, end: date) -> List[OHLCV]:
+        self.calls += 1
+        days = (end - start).days
+        return [
+            OHLCV(
+                symbol=symbol,
+                candle_date=start + timedelta(days=i),
+                open_price=100.0,
+                high=110.0,
+                low=90.0,
+                close=100.0,
+                volume=1_000,
+            )
+            for i in range(days)
+        ]
+
+    def get_corporate_actions(self, symbol: str, start: date, end: date):
+        split_date = date(2024, 1, 5)
+        if not start <= split_date < end:
+            return []
+        return [
+            CorporateAction(
+                symbol=symbol,
+                ex_date=split_date,
+                action_type=CorporateActionType.SPLIT,
+                value=2.0,
+            )
+        ]
+
+
+def test_raw_and_adjusted_views_share_one_fetch():
+    provider = CountingProvider()
+    cache = CandleCache(provider)
+    start, end = date(2024, 1, 1), date(2024, 1, 11)
+
+    raw = cache.get_daily_ohlcv("AAPL", start, end)
+    adjusted = cache.get_daily_ohlcv("AAPL", start, end, adjusted=True)
+
+    assert provider.calls == 1
+    assert raw[0].close == pytest.approx(100.0)
+    assert adjusted[0].close == pytest.approx(50.0)
+    assert adjusted[0].volume == 2_000
+    assert adjusted[4].close == pytest.approx(100.0)
+
+
+def test_new_dividend_updates_factors_without_refetch():
+    provider = CountingProvider()
+    cache = CandleCache(provider)
+    start, end = date(2024, 1, 1), date(2024, 1, 11)
+    cache.get_daily_ohlcv("AAPL", start, end)
+
+    cache.add_corporate_action(
+        CorporateAction(
+            symbol="AAPL",
+            ex_date=date(2024, 1, 8),
+            action_type=CorporateActionType.DIVIDEND,
+            value=1.0,
+        )
+    )
+    factors = cache.get_adjustment_factors("AAPL")
+
+    assert provider.calls == 1
+    assert factors[0] == pytest.approx(0.5 * 0.99)
+    assert factors[5] == pytest.approx(0.99)
+    assert factors[9] == pytest.approx(1.0)
+
+
+def test_wider_range_fetches_only_missing_tail():
+    provider = CountingProvider()
+    cache = CandleCache(provider)
+    cache.get_daily_ohlcv("AAPL", date(2024, 1, 1), date(2024, 1, 4))
+
+    candles = cache.get_daily_ohlcv("AAPL", date(2024, 1, 1), date(2024, 1, 11))
+    adjusted = cache.get_columns(
+        "AAPL", date(2024, 1, 1), date(2024, 1, 11), adjusted=True
+    )
+
+    assert provider.calls == 2
+    assert len(candles) == 10
+    assert adjusted["close"][0] == pytest.approx(50.0)
+
+
+def test_inverted_range_is_rejected_and_not_cached():
+    provider = CountingProvider()
+    cache = CandleCache(provider)
+
+    with pytest.raises(ValueError):
+        cache.get_daily_ohlcv("AAPL", date(2024, 1, 5), date(2024, 1, 1))
+
+    candles = cache.get_daily_ohlcv("AAPL", date(2024, 1, 1), date(2024, 1, 8))
+    dates = [c.candle_date for c in candles]
+
+    assert provider.calls == 1
+    assert len(candles) == 7
+    assert dates == sorted(set(dates))
+
+
+def test_candles_outside_requested_range_are_dropped():
+    class OverfetchingProvider(CountingProvider):
+        def get_daily_ohlcv(self, symbol, start, end):
+            return super().get_daily_ohlcv(symbol, start, end + timedelta(days=2))
+
+    cache = CandleCache(OverfetchingProvider())
+    cache.get_daily_ohlcv("AAPL", date(2024, 1, 1), date(2024, 1, 4))
+
+    candles = cache.get_daily_ohlcv("AAPL", date(2024, 1, 1), date(2024, 1, 8))
+
+    assert [c.candle_date.day for c in candles] == [1, 2, 3, 4, 5, 6, 7]
+
+
+def test_slow_fetch_does_not_block_other_symbols():
+    release = threading.Event()
+
+    class SlowProvider(CountingProvider):
+        def get_daily_ohlcv(self, symbol, start, end):
+            if symbol == "SLOW":
+                assert release.wait(timeout=5)
+            return super().get_daily_ohlcv(symbol, start, end)
+
+    cache = CandleCache(SlowProvider())
+    start, end = date(2024, 1, 1), date(2024, 1, 4)
+    slow = threading.Thread(target=cache.get_daily_ohlcv, args=("SLOW", start, end))
+    slow.start()
+
+    fast = threading.Thread(target=cache.get_daily_ohlcv, args=("FAST", start, end))
+    fast.start()
+    fast.join(timeout=2)
+    finished = not fast.is_alive()
+    release.set()
+    slow.join()
+    fast.join()
+
+    assert finished
+    assert len(cache.get_daily_ohlcv("SLOW", start, end)) == 3
+
+
+def test_known_action_is_not_applied_twice_when_range_grows():
+    provider = CountingProvider()
+    cache = CandleCache(provider)
+    cache.get_daily_ohlcv("AAPL", date(2024, 1, 1), date(2024, 1, 4))
+    cache.add_corporate_action(
+        CorporateAction(
+            symbol="AAPL",
+            ex_date=date(2024, 1, 5),
+            action_type=CorporateActionType.SPLIT,
+            value=2.0,
+        )
+    )
+
+    cache.get_daily_ohlcv("AAPL", date(2024, 1, 1), date(2024, 1, 11))
+
+    assert cache.get_adjustment_factors("AAPL")[0] == pytest.approx(0.5)
+    assert (
+        len(cache.get_corporate_actions("AAPL", date(2024, 1, 1), date(2024, 1, 11)))
+        == 1
+    )
@@ -19,3 +19,10 @@ def test_mock_market_data_provider():
     assert candle.symbol == "AAPL"
     assert candle.open_price == pytest.approx(100.0)
     assert candle.close == pytest.approx(105.0)
+
+
+def test_mock_market_data_provider_empty_range():
+    provider = MockMarketDataProvider()
+
+    assert provider.get_daily_ohlcv("AAPL", date(2024, 1, 2), date(2024, 1, 2)) == []
+    assert provider.get_daily_ohlcv("AAPL", date(2024, 1, 5), date(2024, 1, 1)) == []
@@ -0,0 +1,139 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+
+@pytest.fixture
+def server():
+    env = dict(os.environ, MARKET_PROVIDER="mock", WORKER_PROCESSES="1")
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "app.mcp"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+        env=env,
+    )
+    yield proc
+    proc.kill()
+    proc.wait()
+
+
+def send(proc, message):
+    proc.stdin.write(json.dumps({"jsonrpc": "2.0", **message}) + "\n")
+    proc.stdin.flush()
+
+
+def receive(proc):
+    return json.loads(proc.stdout.readline())
+
+
+def call(proc, request_id, name, arguments):
+    send(
+        proc,
+        {
+            "id": request_id,
+            "method": "tools/call",
+            "params": {"name": name, "arguments": arguments},
+        },
+    )
+    response = receive(proc)
+    assert response["id"] == request_id
+    assert response["result"]["isError"] is False
+    return response["result"]["structuredContent"]["result"]
+
+
+def test_tools_over_stdio_with_mock_provider(server):
+    send(server, {"id": 1, "method": "initialize", "params": {}})
+    assert receive(server)["result"]["serverInfo"]["name"] == "stockmcp"
+    send(server, {"method": "notifications/initialized"})
+
+    send(server, {"id": 2, "method": "tools/list"})
+    names = {t["name"] for t in receive(server)["result"]["tools"]}
+    assert names == {"get_candles", "scan_signals", "run_backtest", "run_sweep"}
+
+    window = {"start": "2024-01-01", "end": "2024-07-01"}
+    candles = call(server, 3, "get_candles", {"symbol": "AAPL", **window})
+    assert len(candles) == 182
+
+    signals = call(server, 4, "scan_signals", {"symbols": ["AAPL", "MSFT"], **window})
+    assert [s["symbol"] for s in signals] == ["AAPL", "MSFT"]
+
+    first = call(server, 5, "run_backtest", {"symbol": "AAPL", **window})
+    started = time.perf_counter()
+    again = call(server, 6, "run_backtest", {"symbol": "AAPL", **window})
+    assert again == first
+    assert time.perf_counter() - started < 0.5
+
+    ranked = call(
+        server,
+        7,
+        "run_sweep",
+        {
+            "symbol": "AAPL",
+            "short_windows": [5, 10],
+            "long_windows": [20, 30],
+            "top": 3,
+            **window,
+        },
+    )
+    assert len(ranked) == 3
+    assert ranked[0]["total_pnl"] >= ranked[-1]["total_pnl"]
+
+
+def test_cancelled_call_gets_no_response(server):
+    send(
+        server,
+        {
+            "id": "sweep",
+            "method": "tools/call",
+            "params": {
+                "name": "run_sweep",
+                "arguments": {
+                    "symbol": "AAPL",
+                    "start": "2020-01-01",
+                    "end": "2024-01-01",
+                    "short_windows": list(range(2, 40)),
+                    "long_windows": list(range(40, 80)),
+                },
+            },
+        },
+    )
+    send(
+        server,
+        {"method": "notifications/cancelled", "params": {"requestId": "sweep"}},
+    )
+    send(server, {"id": "ping", "method": "ping"})
+    assert receive(server) == {"jsonrpc": "2.0", "id": "ping", "result": {}}
+
+    server.stdin.close()
+    assert server.stdout.read() == ""
+    assert server.wait(timeout=10) == 0
+
+
+def test_unknown_method_is_a_jsonrpc_error(server):
+    send(server, {"id": 1, "method": "resources/list"})
+    assert receive(server)["error"]["code"] == -32601
+
+
+def test_malformed_params_are_rejected_without_killing_the_server(server):
+    send(server, {"id": 1, "method": "tools/call", "params": [1]})
+    assert receive(server)["error"]["code"] == -32602
+
+    send(
+        server,
+        {
+            "id": 2,
+            "method": "tools/call",
+            "params": {"name": "get_candles", "arguments": [1]},
+        },
+    )
+    assert receive(server)["error"]["code"] == -32602
+
+    send(server, {"method": "notifications/cancelled", "params": [1]})
+    send(server, {"id": 3, "method": "ping"})
+    assert receive(server) == {"jsonrpc": "2.0", "id": 3, "result": {}}
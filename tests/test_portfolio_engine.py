@@ -1,4 +1,8 @@
+import random
 from datetime import date
+
+import pytest
+
 from app.portfolio.engine import PortfolioEngine
 from app.portfolio.models import Portfolio
 from app.signals.enums import SignalType
@@ -29,3 +33,77 @@ def test_portfolio_buy_and_sell():
 
     assert "AAPL" not in portfolio.positions
     assert portfolio.cash > 10000
+
+
+def test_portfolio_apply_signals_sells_then_buys_in_batch():
+    portfolio = Portfolio(cash=1000, positions={}, equity=1000)
+    engine = PortfolioEngine()
+    portfolio = engine.apply_signal(
+        portfolio=portfolio,
+        symbol="MSFT",
+        signal=SignalType.BUY,
+        price=10,
+        date=date(2024, 1, 1),
+    )
+
+    portfolio = engine.apply_signals(
+        portfolio=portfolio,
+        symbols=["AAPL", "MSFT", "GOOG"],
+        signals=[SignalType.BUY, SignalType.SELL, SignalType.BUY],
+        prices=[20, 12, 50],
+        date=date(2024, 1, 2),
+        max_position_fraction=0.5,
+    )
+
+    assert "MSFT" not in portfolio.positions
+    assert set(portfolio.positions) == {"AAPL", "GOOG"}
+    assert portfolio.cash >= 0
+    assert (
+        portfolio.equity
+        == portfolio.cash
+        + 20 * portfolio.positions["AAPL"].quantity
+        + 50 * portfolio.positions["GOOG"].quantity
+    )
+
+
+def test_running_equity_matches_marking_every_position():
+    rng = random.Random(3)
+    engine = PortfolioEngine()
+    portfolio = Portfolio(cash=10000, positions={}, equity=10000)
+    last_prices = {}
+
+    for _ in range(500):
+        symbol = rng.choice("ABCDEFGH")
+        price = rng.uniform(50, 150)
+        last_prices[symbol] = price
+        portfolio = engine.apply_signal(
+            portfolio=portfolio,
+            symbol=symbol,
+            signal=rng.choice(list(SignalType)),
+            price=price,
+            date=date(2024, 1, 1),
+        )
+
+    assert portfolio.positions
+    assert portfolio.equity == pytest.approx(
+        portfolio.cash
+        + sum(p.quantity * last_prices[p.symbol] for p in portfolio.positions.values())
+    )
+
+
+def test_apply_signals_is_order_independent_with_equal_scores():
+    symbols, prices = ["A", "B", "C"], [70.0, 230.0, 130.0]
+    allocations = set()
+
+    for perm in ([0, 1, 2], [1, 2, 0], [2, 0, 1]):
+        portfolio = PortfolioEngine().apply_signals(
+            portfolio=Portfolio(cash=3000, positions={}, equity=3000),
+            symbols=[symbols[i] for i in perm],
+            signals=[SignalType.BUY] * 3,
+            prices=[prices[i] for i in perm],
+            date=date(2024, 1, 1),
+            max_position_fraction=0.5,
+        )
+        allocations.add(tuple(portfolio.positions[s].quantity for s in symbols))
+
+    assert len(allocations) == 1
@@ -0,0 +1,139 @@
+from datetime import date
+
+import pytest
+
+from app.market.mock import FlakyMarketDataProvider, MockMarketDataProvider
+from app.market.resilient import (
+    AdaptiveConcurrency,
+    CircuitOpenError,
+    ResilientMarketDataProvider,
+    TokenBucket,
+)
+
+START, END = date(2024, 1, 1), date(2024, 1, 2)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_retries_with_backoff_then_succeeds():
+    clock = FakeClock()
+    provider = ResilientMarketDataProvider(
+        FlakyMarketDataProvider(fail_first=2),
+        max_retries=3,
+        clock=clock,
+        sleep=clock.sleep,
+        seed=1,
+    )
+
+    candles = provider.get_daily_ohlcv("AAPL", START, END)
+    metrics = provider.metrics()
+
+    assert len(candles) == 1
+    assert metrics.failures == 2
+    assert metrics.retries == 2
+    assert metrics.successes == 1
+    assert metrics.error_rate == pytest.approx(2 / 3)
+
+
+def test_circuit_opens_and_recovers_after_timeout():
+    clock = FakeClock()
+    flaky = FlakyMarketDataProvider(fail_first=3)
+    provider = ResilientMarketDataProvider(
+        flaky,
+        max_retries=0,
+        failure_threshold=3,
+        reset_timeout=10.0,
+        clock=clock,
+        sleep=clock.sleep,
+    )
+
+    for _ in range(3):
+        with pytest.raises(ConnectionError):
+            provider.get_daily_ohlcv("AAPL", START, END)
+    with pytest.raises(CircuitOpenError):
+        provider.get_daily_ohlcv("AAPL", START, END)
+    assert flaky.calls == 3
+
+    clock.now += 10.0
+    assert provider.get_daily_ohlcv("AAPL", START, END)
+    assert provider.metrics().circuit_state == "closed"
+
+
+def test_token_bucket_paces_requests():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2.0, capacity=1.0, clock=clock, sleep=clock.sleep)
+
+    waits = [bucket.acquire() for _ in range(3)]
+
+    assert waits == [0.0, pytest.approx(0.5), pytest.approx(0.5)]
+
+
+def test_adaptive_concurrency_is_aimd():
+    limiter = AdaptiveConcurrency(minimum=1, maximum=4, initial=4)
+
+    limiter.record_failure()
+    assert limiter.limit == 2
+    for _ in range(2):
+        limiter.record_success()
+    assert limiter.limit == 3
+
+
+def test_fetch_many_reports_failures_without_failing_batch():
+    flaky = FlakyMarketDataProvider(latency=0.001, failure_rate=0.3, seed=3)
+    provider = ResilientMarketDataProvider(
+        flaky,
+        rate=1000.0,
+        burst=1000.0,
+        max_retries=5,
+        backoff_base=0.0,
+        failure_threshold=1000,
+        max_concurrency=4,
+    )
+    symbols = [f"SYM{i}" for i in range(40)]
+
+    results, errors = provider.fetch_many(symbols, START, END)
+
+    assert set(results) | set(errors) == set(symbols)
+    assert len(results) >= 35
+    assert provider.metrics().throughput > 0
+
+
+def test_invalid_request_releases_half_open_trial():
+    class StrictProvider(MockMarketDataProvider):
+        def get_daily_ohlcv(self, symbol, start, end):
+            if not symbol:
+                raise ValueError("symbol must be provided")
+            return super().get_daily_ohlcv(symbol, start, end)
+
+    clock = FakeClock()
+    provider = ResilientMarketDataProvider(
+        FlakyMarketDataProvider(StrictProvider(), fail_first=1),
+        max_retries=0,
+        failure_threshold=1,
+        reset_timeout=10.0,
+        clock=clock,
+        sleep=clock.sleep,
+    )
+    with pytest.raises(ConnectionError):
+        provider.get_daily_ohlcv("AAPL", START, END)
+
+    clock.now += 10.0
+    with pytest.raises(ValueError):
+        provider.get_daily_ohlcv("", START, END)
+
+    assert provider.get_daily_ohlcv("AAPL", START, END)
+    assert provider.metrics().circuit_state == "closed"
+
+    candles, actions = provider.get_history("AAPL", START, END)
+    assert len(candles) == 1 and actions == []
@@ -0,0 +1,123 @@
+import math
+from datetime import date, timedelta
+
+from app.backtest.engine import BacktestEngine
+from app.market.models import OHLCV
+from app.portfolio.engine import PortfolioEngine
+from app.portfolio.models import Portfolio
+from app.portfolio.risk import RiskLimits, RiskManager
+from app.signals.enums import SignalType
+from app.signals.swing_sma_rsi import SwingSMARsiStrategy
+
+
+def test_risk_manager_tracks_drawdown_and_halts():
+    risk = RiskManager(RiskLimits(max_drawdown=0.1))
+    day = date(2024, 1, 1)
+
+    risk.update_equity(100.0, day)
+    risk.update_equity(120.0, day)
+    risk.update_equity(110.0, day)
+    assert risk.peak_equity == 120.0
+    assert not risk.halted
+
+    risk.update_equity(100.0, day + timedelta(days=1))
+    assert risk.halted
+    assert risk.allowed_quantity("AAPL", 10, 10.0, 100.0) == 0
+
+
+def test_daily_loss_blocks_until_next_day():
+    risk = RiskManager(RiskLimits(max_drawdown=0.9, max_daily_loss=0.05))
+    day = date(2024, 1, 1)
+
+    risk.update_equity(100.0, day)
+    risk.update_equity(94.0, day)
+    assert risk.blocked and not risk.halted
+
+    risk.update_equity(94.0, day + timedelta(days=1))
+    assert not risk.blocked
+
+
+def test_daily_loss_with_one_mark_per_day():
+    risk = RiskManager(RiskLimits(max_drawdown=0.9, max_daily_loss=0.05))
+    day = date(2024, 1, 1)
+
+    risk.update_equity(100.0, day)
+    assert not risk.blocked
+
+    risk.update_equity(80.0, day + timedelta(days=1))
+    assert risk.daily_loss == 0.2
+    assert risk.blocked
+
+    risk.update_equity(80.0, day + timedelta(days=2))
+    assert risk.daily_loss == 0.0
+    assert not risk.blocked
+
+
+def test_other_positions_keep_their_last_mark():
+    risk = RiskManager(RiskLimits(max_drawdown=0.05))
+    engine = PortfolioEngine(risk=risk)
+    portfolio = Portfolio(cash=10000, positions={}, equity=10000)
+
+    portfolio = engine.apply_signal(
+        portfolio=portfolio,
+        symbol="AAPL",
+        signal=SignalType.BUY,
+        price=500,
+        date=date(2024, 1, 1),
+    )
+    portfolio = engine.apply_signal(
+        portfolio=portfolio,
+        symbol="MSFT",
+        signal=SignalType.HOLD,
+        price=10,
+        date=date(2024, 1, 1),
+    )
+
+    assert portfolio.equity == 10000
+    assert risk.drawdown == 0.0
+    assert not risk.halted
+
+
+def test_position_exposure_caps_entry_size():
+    risk = RiskManager(RiskLimits(max_position_exposure=0.05))
+    engine = PortfolioEngine(risk=risk)
+    portfolio = Portfolio(cash=10000, positions={}, equity=10000)
+
+    portfolio = engine.apply_signal(
+        portfolio=portfolio,
+        symbol="AAPL",
+        signal=SignalType.BUY,
+        price=100,
+        date=date(2024, 1, 1),
+    )
+
+    assert portfolio.positions["AAPL"].quantity == 5
+    assert risk.exposures["AAPL"] == 500
+
+
+def test_backtest_liquidates_after_drawdown_halt():
+    start = date(2024, 1, 1)
+    closes = [100 + i + 3 * math.sin(i) for i in range(60)] + [
+        160 - 3 * i for i in range(1, 40)
+    ]
+    data = [
+        OHLCV(
+            symbol="AAPL",
+            candle_date=start + timedelta(days=i),
+            open_price=close,
+            high=close,
+            low=close,
+            close=close,
+            volume=1000,
+        )
+        for i, close in enumerate(closes)
+    ]
+
+    engine = BacktestEngine(
+        risk_limits=RiskLimits(max_drawdown=0.001, liquidate_on_halt=True)
+    )
+    result = engine.run(data=data, strategy=SwingSMARsiStrategy())
+
+    assert result.halt_reason is not None
+    assert result.trades
+    assert all(t.exit_date is not None for t in result.trades)
@@ -0,0 +1,64 @@
+import numpy as np
+
+from app.portfolio.sizing import batch_sizing
+
+
+def test_batch_sizing_respects_caps_and_budget():
+    prices = np.array([100.0, 50.0, 20.0, 10.0])
+    strengths = np.array([1.0, 2.0, 0.5, 0.0])
+    volatilities = np.array([0.02, 0.02, 0.01, 0.01])
+
+    shares = batch_sizing(
+        cash=10_000,
+        prices=prices,
+        strengths=strengths,
+        volatilities=volatilities,
+        max_position_fraction=0.4,
+        max_total_exposure=0.9,
+    )
+
+    cost = shares * prices
+    assert shares.dtype == np.int64
+    assert shares[3] == 0
+    assert (cost <= 4_000).all()
+    assert cost.sum() <= 9_000
+    assert cost.sum() > 8_900
+
+
+def test_batch_sizing_is_order_independent():
+    rng = np.random.default_rng(7)
+    prices = rng.uniform(5, 500, 1_000)
+    strengths = rng.uniform(0, 1, 1_000)
+    volatilities = rng.uniform(0.01, 0.05, 1_000)
+    perm = rng.permutation(1_000)
+
+    shares = batch_sizing(1_000_000, prices, strengths, volatilities)
+    shuffled = batch_sizing(
+        1_000_000, prices[perm], strengths[perm], volatilities[perm]
+    )
+
+    assert (shares[perm] == shuffled).all()
+    assert (shares * prices).sum() <= 1_000_000
+
+
+def test_batch_sizing_skips_invalid_candidates():
+    shares = batch_sizing(1_000, [10.0, np.nan], [1.0, 1.0], [0.1, 0.1])
+    assert shares.tolist() == [10, 0]
+
+    shares = batch_sizing(1_000, [10.0, 10.0, 10.0], [1.0] * 3, [0.1, 0.0, -0.1])
+    assert shares.tolist() == [10, 0, 0]
+
+
+def test_batch_sizing_breaks_score_ties_by_price_then_key():
+    prices = np.array([70.0, 230.0, 130.0])
+    ones = np.ones(3)
+    keys = np.array(["A", "B", "C"])
+    shares = batch_sizing(
+        3000, prices, ones, ones, max_position_fraction=0.5, keys=keys
+    )
+
+    for perm in ([1, 2, 0], [2, 0, 1]):
+        permuted = batch_sizing(
+            3000, prices[perm], ones, ones, max_position_fraction=0.5, keys=keys[perm]
+        )
+        assert (permuted == shares[perm]).all()
@@ -0,0 +1,142 @@
+import json
+import os
+import subprocess
+import sys
+from datetime import date
+
+import pytest
+
+from app.backtest.cache import BacktestCache
+from app.backtest.queue import (
+    SQLiteWorkQueue,
+    SweepIncompleteError,
+    collect_sweep,
+    run_worker,
+    submit_sweep,
+)
+from app.backtest.sweep import rank_results, run_sweep
+from app.market.mock import MockMarketDataProvider
+
+START, END = date(2023, 1, 1), date(2024, 1, 1)
+GRID = {"short_window": [5, 10, 15], "long_window": [20, 30, 40]}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_expired_lease_is_requeued_and_old_worker_cannot_complete(tmp_path):
+    clock = FakeClock()
+    queue = SQLiteWorkQueue(tmp_path / "queue.db", clock=clock)
+    sweep_id = submit_sweep(queue, ["AAPL"], START, END, GRID, shard_size=100)
+
+    task = queue.lease("w1", lease_seconds=10)
+    clock.now = 5
+    assert queue.lease("w2", lease_seconds=10) is None
+    assert queue.heartbeat(task.task_id, "w1", lease_seconds=10)
+
+    clock.now = 16
+    retaken = queue.lease("w2", lease_seconds=10)
+    assert retaken.task_id == task.task_id
+    assert not queue.heartbeat(task.task_id, "w1", lease_seconds=10)
+    assert not queue.complete(task.task_id, "w1", [])
+    assert queue.complete(task.task_id, "w2", [])
+    assert queue.status(sweep_id).done == 1
+
+
+def test_shard_fails_after_max_attempts(tmp_path):
+    queue = SQLiteWorkQueue(tmp_path / "queue.db", max_attempts=2)
+    sweep_id = submit_sweep(queue, ["AAPL"], START, END, GRID, shard_size=100)
+
+    for _ in range(2):
+        task = queue.lease("w1", lease_seconds=10)
+        queue.fail(task.task_id, "w1", "boom")
+
+    assert queue.lease("w1", lease_seconds=10) is None
+    assert queue.status(sweep_id).failed == 1
+
+
+def test_collect_refuses_incomplete_sweep(tmp_path):
+    queue = SQLiteWorkQueue(tmp_path / "queue.db", max_attempts=1)
+    sweep_id = submit_sweep(queue, ["AAPL", "MSFT"], START, END, GRID, shard_size=100)
+
+    first = queue.lease("w1", lease_seconds=10)
+    queue.complete(first.task_id, "w1", [])
+    second = queue.lease("w1", lease_seconds=10)
+    with pytest.raises(SweepIncompleteError) as excinfo:
+        collect_sweep(queue, sweep_id)
+    assert excinfo.value.status.leased == 1
+
+    queue.fail(second.task_id, "w1", "boom")
+    with pytest.raises(SweepIncompleteError) as excinfo:
+        collect_sweep(queue, sweep_id)
+    assert excinfo.value.status.failed == 1
+    assert collect_sweep(queue, sweep_id, allow_partial=True) == []
+
+
+def test_worker_processes_share_local_queue(tmp_path):
+    db = tmp_path / "queue.db"
+    queue = SQLiteWorkQueue(db)
+    symbols = ["AAPL", "MSFT", "INFY"]
+    sweep_id = submit_sweep(queue, symbols, START, END, GRID, shard_size=2)
+
+    env = dict(os.environ, MARKET_PROVIDER="mock")
+    workers = [
+        subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "app.backtest.queue",
+                "worker",
+                "--db",
+                str(db),
+                "--idle-timeout",
+                "1",
+            ],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            env=env,
+        )
+        for _ in range(3)
+    ]
+    completed = [
+        json.loads(w.communicate(timeout=120)[0])["completed"] for w in workers
+    ]
+
+    status = queue.status(sweep_id)
+    assert sum(completed) == status.done == 15
+    assert status.pending == status.leased == status.failed == 0
+
+    provider = MockMarketDataProvider()
+    expected = rank_results(
+        [
+            r
+            for symbol in symbols
+            for r in run_sweep(provider.get_daily_ohlcv(symbol, START, END), GRID)
+        ]
+    )
+    merged = collect_sweep(queue, sweep_id)
+    assert [(r.symbol, r.params, r.total_pnl) for r in merged] == [
+        (r.symbol, r.params, r.total_pnl) for r in expected
+    ]
+
+
+def test_worker_reuses_cached_results_for_unchanged_inputs(tmp_path):
+    queue = SQLiteWorkQueue(tmp_path / "queue.db")
+    cache = BacktestCache()
+    provider = MockMarketDataProvider()
+
+    first = submit_sweep(queue, ["AAPL"], START, END, GRID, shard_size=4)
+    run_worker(queue, provider, idle_timeout=0, cache=cache)
+    misses = cache.misses
+    second = submit_sweep(queue, ["AAPL"], START, END, GRID, shard_size=4)
+    run_worker(queue, provider, idle_timeout=0, cache=cache)
+
+    assert cache.misses == misses
+    assert cache.hits == misses
+    assert collect_sweep(queue, second) == collect_sweep(queue, first)